@@ -0,0 +1,193 @@
+"""
+RoleIQ HTTP API
+
+Serves the same analysis pipeline as app.py over HTTP so it can sit behind a
+load balancer. Models are loaded once at startup and kept warm; every
+CPU-bound stage runs on a worker pool so the event loop only does I/O, and
+requests beyond ROLEIQ_API_MAX_INFLIGHT are rejected with 503 instead of
+queueing without bound.
+
+The pool is a thread pool by default. Set ROLEIQ_API_PROCESSES to use that
+many pre-forked worker processes sharing the parent's model weights (see
+utils/worker_pool.py).
+
+Run with: uvicorn api:app --host 0.0.0.0 --port 8000
+"""
+import asyncio
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import numpy as np
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from pydantic import BaseModel
+
+ONTOLOGY_PATH = os.environ.get('ROLEIQ_ONTOLOGY_PATH', 'data/ontologies/esco_skills_en.csv')
+SENIORITY_PATH = os.environ.get('ROLEIQ_SENIORITY_PATH', 'data/ontologies/seniority_levels.json')
+WORKERS = int(os.environ.get('ROLEIQ_API_WORKERS', str(os.cpu_count() or 1)))
+PROCESSES = int(os.environ.get('ROLEIQ_API_PROCESSES', '0'))
+MAX_INFLIGHT = int(os.environ.get('ROLEIQ_API_MAX_INFLIGHT', str((PROCESSES or WORKERS) * 2)))
+ALLOWED_EXTENSIONS = {'.pdf', '.docx'}
+
+_executor = None
+_inflight = None
+_process_pool = None
+
+
+def _warm_models():
+    """Load spaCy, the sentence transformer and the ontology index into this process"""
+    from utils.model_cache import get_nlp, get_embedding_model
+    from utils.ontology_index import get_ontology_index
+    get_nlp()
+    get_ontology_index(ONTOLOGY_PATH, get_embedding_model())
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global _executor, _inflight, _process_pool
+    _inflight = asyncio.Semaphore(MAX_INFLIGHT)
+    if PROCESSES > 0:
+        from utils.worker_pool import PreforkPool
+        # Fork before any executor threads exist; models load here, in the parent
+        _process_pool = PreforkPool(PROCESSES, ONTOLOGY_PATH).start()
+        _executor = _process_pool.executor
+    else:
+        _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='roleiq-worker')
+        await asyncio.get_running_loop().run_in_executor(_executor, _warm_models)
+    yield
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False)
+    else:
+        _executor.shutdown(wait=False)
+
+
+app = FastAPI(title="RoleIQ API", lifespan=lifespan)
+
+
+def to_jsonable(value):
+    """Convert analysis results (numpy scalars/arrays, sets, tuples) to plain JSON types"""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+async def run_in_pool(func, *args):
+    """Run a CPU-bound call on the worker pool, rejecting it if the node is saturated"""
+    if _inflight.locked():
+        raise HTTPException(
+            status_code=503,
+            detail='Server is at capacity, retry shortly',
+            headers={'Retry-After': '1'}
+        )
+    async with _inflight:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+
+
+async def read_upload(upload):
+    """Uploaded PDF/DOCX as an in-memory buffer named after the upload (nothing is written to disk)"""
+    ext = os.path.splitext(upload.filename or '')[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f'Unsupported file type: {upload.filename}')
+    buffer = io.BytesIO(await upload.read())
+    buffer.name = upload.filename
+    return buffer
+
+
+def _analyze(resume, jd_input, budgets=None):
+    from utils.matcher import match_resume_jd
+    return match_resume_jd(resume, jd_input, ONTOLOGY_PATH, SENIORITY_PATH, budgets)
+
+
+def _batch_analyze(resumes, jds, top_k):
+    from utils.batch import analyze_batch
+    return analyze_batch(resumes, jds, ONTOLOGY_PATH, SENIORITY_PATH, top_k=top_k)
+
+
+def _extract_skills(text):
+    from utils.extractor import extract_skills
+    from utils.model_cache import get_embedding_model
+    from utils.ontology_index import get_ontology_index
+    from utils.parser import clean_text
+    return extract_skills(clean_text(text), get_ontology_index(ONTOLOGY_PATH, get_embedding_model()))
+
+
+class ExtractSkillsRequest(BaseModel):
+    text: str
+
+
+@app.get("/health")
+async def health():
+    return {
+        'status': 'ok',
+        'mode': 'processes' if PROCESSES > 0 else 'threads',
+        'workers': PROCESSES if PROCESSES > 0 else WORKERS,
+        'max_inflight': MAX_INFLIGHT
+    }
+
+
+@app.post("/analyze")
+async def analyze(
+    resume: UploadFile = File(...),
+    jd: Optional[UploadFile] = File(None),
+    jd_text: Optional[str] = Form(None),
+    max_gaps: Optional[int] = Form(None),
+    max_evidence_skills: Optional[int] = Form(None),
+    max_placement_skills: Optional[int] = Form(None),
+    max_bullets: Optional[int] = Form(None)
+):
+    """
+    Full resume vs JD analysis; the JD is an uploaded file or pasted text
+    The optional max_* fields cap the per-item analyzers for this request
+    (defaults: the server's ROLEIQ_MAX_* settings; a negative value removes the cap).
+    """
+    if jd is None and not jd_text:
+        raise HTTPException(status_code=400, detail='Provide a job description file or jd_text')
+    budgets = {
+        'max_gaps': max_gaps,
+        'max_evidence_skills': max_evidence_skills,
+        'max_placement_skills': max_placement_skills,
+        'max_bullets': max_bullets
+    }
+
+    resume_input = await read_upload(resume)
+    jd_input = await read_upload(jd) if jd is not None else jd_text
+    result = await run_in_pool(_analyze, resume_input, jd_input, budgets)
+
+    if 'error' in result:
+        status = 422 if result['error_type'] in ('PARSE_ERROR', 'VALIDATION_ERROR') else 500
+        raise HTTPException(status_code=status, detail=to_jsonable(result))
+    return to_jsonable(result)
+
+
+@app.post("/batch-analyze")
+async def batch_analyze(
+    resumes: List[UploadFile] = File(...),
+    jds: List[UploadFile] = File(None),
+    jd_texts: List[str] = Form(None),
+    top_k: Optional[int] = Form(None)
+):
+    """Score every resume against every JD (files and/or pasted texts) and rank both ways"""
+    if not jds and not jd_texts:
+        raise HTTPException(status_code=400, detail='Provide at least one job description')
+
+    resume_inputs = [await read_upload(upload) for upload in resumes]
+    jd_inputs = [await read_upload(upload) for upload in jds or []]
+    jd_inputs.extend(jd_texts or [])
+
+    result = await run_in_pool(_batch_analyze, resume_inputs, jd_inputs, top_k)
+    return to_jsonable(result)
+
+
+@app.post("/extract-skills")
+async def extract_skills_endpoint(request: ExtractSkillsRequest):
+    """Skills found in a piece of text (resume or JD)"""
+    skills = await run_in_pool(_extract_skills, request.text)
+    return {'skills': to_jsonable(skills)}
@@ -72,12 +72,8 @@ with col2:
 if st.button("Analyze", key="analyze_btn") and resume_file:
     jd_input = ""
     if jd_file:
-        # Save and parse JD file with extension
-        jd_ext = os.path.splitext(jd_file.name)[1]
-        temp_jd_path = f"temp_jd{jd_ext}"
-        with open(temp_jd_path, "wb") as f:
-            f.write(jd_file.getvalue())
-        jd_input = temp_jd_path
+        # Uploaded files are parsed in memory; nothing is written to disk
+        jd_input = jd_file
     elif jd_text:
         jd_input = jd_text
     else:
@@ -93,18 +89,12 @@ if st.button("Analyze", key="analyze_btn") and resume_file:
         progress_text.text("📄 Parsing documents...")
         progress_bar.progress(20)
 
-        # Save uploaded resume with extension
-        resume_ext = os.path.splitext(resume_file.name)[1]
-        temp_resume_path = f"temp_resume{resume_ext}"
-        with open(temp_resume_path, "wb") as f:
-            f.write(resume_file.getvalue())
-
         # Step 2: Extract skills and content
         progress_text.text("🔍 Extracting skills and analyzing content...")
         progress_bar.progress(40)
 
         result = match_resume_jd(
-            temp_resume_path,
+            resume_file,
             jd_input,
             'data/ontologies/esco_skills_en.csv',
             'data/ontologies/seniority_levels.json'
@@ -121,11 +111,6 @@ if st.button("Analyze", key="analyze_btn") and resume_file:
             st.error(f"**{result['error_type']}:** {result['error']}")
             if 'details' in result:
                 st.info(result['details'])
-            # Cleanup temp files
-            if os.path.exists(temp_resume_path):
-                os.remove(temp_resume_path)
-            if jd_file and os.path.exists(jd_input):
-                os.remove(jd_input)
             st.stop()
 
         # Step 3: Computing match score
@@ -156,11 +141,6 @@ if st.button("Analyze", key="analyze_btn") and resume_file:
 
     except Exception as e:
         st.error(f"An error occurred during analysis: {str(e)}")
-        # Cleanup temp files on error
-        if os.path.exists(temp_resume_path):
-            os.remove(temp_resume_path)
-        if jd_file and 'temp_jd_path' in locals() and os.path.exists(temp_jd_path):
-            os.remove(temp_jd_path)
         st.stop()
 
     st.success("Analysis Complete!")
@@ -443,10 +423,7 @@ if st.button("Analyze", key="analyze_btn") and resume_file:
     pdf.set_font("Arial", 'I', size=9)
     pdf.cell(0, 10, "Generated by RoleIQ - AI Resume Matcher", 0, 0, 'C')
 
-    pdf_output = "analysis_report.pdf"
-    pdf.output(pdf_output)
-    with open(pdf_output, "rb") as f:
-        pdf_bytes = f.read()
+    pdf_bytes = bytes(pdf.output())  # Rendered in memory
     st.download_button(
         "📥 Download PDF Report",
         pdf_bytes,
@@ -468,14 +445,3 @@ if st.button("Analyze", key="analyze_btn") and resume_file:
 
     # Mark analysis as complete to show "Analyze Another" button
     st.session_state.analysis_complete = True
-
-    # Cleanup temp files
-    try:
-        if os.path.exists(temp_resume_path):
-            os.remove(temp_resume_path)
-        if jd_file and os.path.exists(jd_input):
-            os.remove(jd_input)
-        if os.path.exists(pdf_output):
-            os.remove(pdf_output)
-    except Exception:
-        pass  # Silently ignore cleanup errors
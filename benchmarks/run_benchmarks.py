@@ -0,0 +1,254 @@
+"""
+End-to-end benchmark for match_resume_jd
+
+Runs the full pipeline over the sample documents in data/samples and over
+synthetic resume/JD pairs of growing size, and writes wall time, peak RSS and
+per-stage latency percentiles as JSON so runs can be diffed between commits.
+
+Usage (from the repo root):
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --repeats 10 --sizes 1,10,50 --output before.json
+
+Peak RSS comes from getrusage, which is a process-wide high-water mark, so the
+per-case value is the peak reached so far (cases run in increasing size).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from utils.document_cache import get_document_cache
+from utils.matcher import match_resume_jd
+from utils.model_cache import get_nlp, get_embedding_model, model_load_times
+from utils.parser import parse_document
+from utils.timing import StageRecorder, record_stages
+
+SAMPLES_DIR = 'data/samples'
+DEFAULT_ONTOLOGY = 'data/ontologies/esco_skills_en.csv'
+DEFAULT_SENIORITY = 'data/ontologies/seniority_levels.json'
+DEFAULT_SIZES_KB = [1, 5, 10, 25, 50]
+PERCENTILES = [50, 90, 99]
+
+# Vocabulary for synthetic documents
+_ROLES = ['Software Engineer', 'Senior Accountant', 'Product Manager', 'Data Analyst',
+          'Compensation Manager', 'Operations Director', 'Marketing Specialist', 'HR Business Partner']
+_COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Health', 'Stark Industries', 'Wayne Financial']
+_SKILLS = ['python', 'sql', 'excel', 'tableau', 'project management', 'financial reporting',
+           'stakeholder management', 'payroll', 'budgeting', 'forecasting', 'aws', 'docker',
+           'data analysis', 'agile', 'salesforce', 'workday', 'gaap', 'reconciliation',
+           'machine learning', 'compensation design', 'vendor management', 'process improvement']
+_VERBS = ['Led', 'Managed', 'Developed', 'Implemented', 'Designed', 'Reduced', 'Increased',
+          'Built', 'Coordinated', 'Streamlined', 'Delivered', 'Analyzed']
+_OBJECTS = ['the month-end close process', 'a cross-functional team of {n} analysts',
+            'the annual compensation review', 'a customer analytics platform',
+            'vendor contracts worth ${n}M', 'the migration to a new ERP system',
+            'reporting dashboards for executive leadership', 'hiring for {n} open roles']
+_OUTCOMES = ['reducing cycle time by {n}%', 'saving ${n}K annually', 'improving accuracy by {n}%',
+             'supporting {n} business units', 'increasing revenue by {n}%']
+
+
+def _bullet(rng):
+    text = f"{rng.choice(_VERBS)} {rng.choice(_OBJECTS)} using {rng.choice(_SKILLS)} and {rng.choice(_SKILLS)}"
+    if rng.random() < 0.6:
+        text += f", {rng.choice(_OUTCOMES)}"
+    return text.format(n=rng.randint(2, 95)) + '.'
+
+
+def synthetic_resume(target_bytes, seed=0):
+    """Deterministic resume text of roughly target_bytes"""
+    rng = random.Random(seed)
+    lines = [
+        'Jordan Example', 'jordan@example.com | 555-0100',
+        'SUMMARY', f"{rng.choice(_ROLES)} with experience across finance, technology and operations.",
+        'SKILLS', ', '.join(rng.sample(_SKILLS, 12)),
+        'EDUCATION', 'Bachelor of Science in Business Administration, State University, 2010',
+        'EXPERIENCE'
+    ]
+    year = 2024
+    while len('\n'.join(lines)) < target_bytes:
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(_ROLES)}, {rng.choice(_COMPANIES)}, {start} - {year}")
+        lines.extend(f"• {_bullet(rng)}" for _ in range(rng.randint(4, 8)))
+        year = start
+    return '\n'.join(lines)[:target_bytes]
+
+
+def synthetic_jd(target_bytes, seed=0):
+    """Deterministic job description text of roughly target_bytes"""
+    rng = random.Random(seed + 1000)
+    lines = [
+        f"{rng.choice(_ROLES)} - {rng.choice(_COMPANIES)}",
+        'About the role',
+        f"We are hiring an experienced professional with {rng.randint(3, 10)}+ years of experience.",
+        'Responsibilities'
+    ]
+    while len('\n'.join(lines)) < target_bytes:
+        lines.append(f"- {_bullet(rng)}")
+        if rng.random() < 0.3:
+            lines.append(f"- Required: strong knowledge of {rng.choice(_SKILLS)} and {rng.choice(_SKILLS)}.")
+        if rng.random() < 0.1:
+            lines.append("- Bachelor's degree in finance, business or a related field; CPA preferred.")
+    return '\n'.join(lines)[:target_bytes]
+
+
+def sample_cases(samples_dir=SAMPLES_DIR):
+    """(name, resume, jd) cases built from the files in data/samples"""
+    if not os.path.isdir(samples_dir):
+        return []
+    files = sorted(os.listdir(samples_dir))
+    resumes = [os.path.join(samples_dir, f) for f in files
+               if 'resume' in f.lower() and f.lower().endswith(('.pdf', '.docx'))]
+    jds = []
+    for f in files:
+        path = os.path.join(samples_dir, f)
+        if 'resume' in f.lower():
+            continue
+        if f.lower().endswith(('.pdf', '.docx')):
+            jds.append((f, path))
+        elif f.lower().endswith('.csv'):
+            import pandas as pd
+            # The sample JD CSV has no header row: every cell is JD text
+            df = pd.read_csv(path, header=None)
+            jds.append((f, ' '.join(str(v) for v in df.values.ravel() if isinstance(v, str))))
+    return [(f"sample:{os.path.basename(r)} x {name}", r, jd) for r in resumes for name, jd in jds]
+
+
+def write_docx(text, path):
+    """Save text as a DOCX, one paragraph per line (match_resume_jd parses resumes from files)"""
+    from docx import Document
+    document = Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    document.save(path)
+    return path
+
+
+def synthetic_cases(sizes_kb, work_dir):
+    cases = []
+    for kb in sizes_kb:
+        resume_path = write_docx(synthetic_resume(kb * 1024, seed=kb), os.path.join(work_dir, f"resume_{kb}kb.docx"))
+        cases.append((f"synthetic:{kb}KB", resume_path, synthetic_jd(kb * 1024, seed=kb)))
+    return cases
+
+
+def percentiles(values):
+    values = np.asarray(values, dtype=np.float64) * 1000  # milliseconds
+    summary = {f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+    summary.update({'mean': float(values.mean()), 'min': float(values.min()), 'max': float(values.max())})
+    return summary
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _text_chars(doc):
+    """Characters of text the pipeline sees (parsed text for files)"""
+    return len(parse_document(doc)) if os.path.isfile(doc) else len(doc)
+
+
+def run_case(name, resume, jd, ontology, seniority, repeats, warmup, keep_document_cache=False):
+    for _ in range(warmup):
+        match_resume_jd(resume, jd, ontology, seniority)
+
+    wall = []
+    recorder = StageRecorder()
+    error = None
+    for _ in range(repeats):
+        if not keep_document_cache:
+            # Otherwise every repeat after the first skips parsing, sectioning and skill extraction
+            get_document_cache().memory.clear()
+        start = time.perf_counter()
+        with record_stages(recorder):
+            result = match_resume_jd(resume, jd, ontology, seniority)
+        wall.append(time.perf_counter() - start)
+        if 'error' in result:
+            error = f"{result['error_type']}: {result['error']}"
+            break
+
+    return {
+        'name': name,
+        'resume_chars': _text_chars(resume),
+        'jd_chars': _text_chars(jd),
+        'repeats': len(wall),
+        'wall_ms': percentiles(wall),
+        'stages_ms': {stage_name: percentiles(values) for stage_name, values in recorder.timings.items()},
+        'peak_rss_mb': peak_rss_mb(),
+        'error': error
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark match_resume_jd end to end')
+    parser.add_argument('--repeats', type=int, default=5, help='Timed runs per case')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs per case')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES_KB),
+                        help='Synthetic document sizes in KB, comma-separated')
+    parser.add_argument('--no-samples', action='store_true', help='Skip the data/samples documents')
+    parser.add_argument('--ontology', default=DEFAULT_ONTOLOGY)
+    parser.add_argument('--seniority', default=DEFAULT_SENIORITY)
+    parser.add_argument('--keep-document-cache', action='store_true',
+                        help='Measure repeat uploads (parsed documents served from the cache)')
+    parser.add_argument('--output', help='JSON output path (default: stdout)')
+    args = parser.parse_args(argv)
+
+    ontology = args.ontology
+    if not os.path.isfile(ontology):
+        print(f"Ontology {ontology} not found; benchmarking without ontology matching", file=sys.stderr)
+        ontology = []
+
+    rss_before_models = peak_rss_mb()
+    get_nlp()
+    get_embedding_model()
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        cases = [] if args.no_samples else sample_cases()
+        cases += synthetic_cases([int(s) for s in args.sizes.split(',') if s.strip()], work_dir)
+        for name, resume, jd in cases:
+            print(f"Running {name}...", file=sys.stderr)
+            results.append(run_case(name, resume, jd, ontology, args.seniority, args.repeats, args.warmup,
+                                    args.keep_document_cache))
+
+    report = {
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': args.repeats,
+        'warmup': args.warmup,
+        'document_cache': args.keep_document_cache,
+        'ontology': args.ontology if ontology else None,
+        'model_load_s': model_load_times(),
+        'peak_rss_mb': {'before_models': rss_before_models, 'final': peak_rss_mb()},
+        'cases': results
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
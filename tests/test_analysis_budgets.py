@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+import spacy
+from utils.analyzers import (
+    analyze_keyword_placement, assess_skill_evidence, extract_skill_context, score_resume_bullets
+)
+from utils.matcher import ANALYSIS_BUDGETS, _env_budget, analysis_budgets
+
+RESUME = (
+    "Reconciled accounts in Excel for 40 entities. "
+    "Built SQL reports that cut close time by 20%. "
+    "Automated variance analysis in Python for the controller team. "
+    "Presented Tableau dashboards to the leadership team every month."
+)
+SKILLS = ['excel', 'sql', 'python', 'tableau']
+
+
+@pytest.fixture(scope='module')
+def nlp():
+    pipeline = spacy.blank('en')
+    pipeline.add_pipe('sentencizer')
+    return pipeline
+
+
+class LengthModel:
+    """Stand-in sentence encoder: a fixed pseudo-random vector per text"""
+
+    def encode(self, texts, **kwargs):
+        return np.array([np.random.default_rng(len(text)).normal(size=8) for text in texts])
+
+
+def test_no_budget_covers_every_item(nlp):
+    assert len(assess_skill_evidence(RESUME, SKILLS, nlp)) == 4
+    placement = analyze_keyword_placement(RESUME, SKILLS)
+    assert sum(len(placement[key]) for key in ('top_third', 'middle_third', 'bottom_third', 'not_found')) == 4
+    assert len(score_resume_bullets(RESUME, nlp)['bullet_scores']) == 4
+    assert len(extract_skill_context(RESUME, RESUME, SKILLS, LengthModel(), nlp)) == 4
+
+
+def test_budgets_limit_output(nlp):
+    evidence = assess_skill_evidence(RESUME, SKILLS, nlp, max_skills=2)
+    assert [item['skill'] for item in evidence] == ['excel', 'sql']
+
+    placement = analyze_keyword_placement(RESUME, SKILLS, max_skills=1)
+    placed = [item['skill'] for key in ('top_third', 'middle_third', 'bottom_third') for item in placement[key]]
+    assert placed == ['excel'] and placement['not_found'] == []
+
+    assert len(score_resume_bullets(RESUME, nlp, max_bullets=3)['bullet_scores']) == 3
+    assert list(extract_skill_context(RESUME, RESUME, SKILLS, LengthModel(), nlp, max_gaps=2)) == ['excel', 'sql']
+    assert extract_skill_context(RESUME, RESUME, SKILLS, LengthModel(), nlp, max_gaps=0) == {}
+
+
+def test_analysis_budgets_overrides():
+    budgets = analysis_budgets({'max_bullets': 5, 'max_gaps': None, 'max_evidence_skills': -1})
+    assert budgets['max_bullets'] == 5
+    assert budgets['max_gaps'] == ANALYSIS_BUDGETS['max_gaps']  # None keeps the configured default
+    assert budgets['max_evidence_skills'] is None  # negative removes the cap
+    assert set(budgets) == set(ANALYSIS_BUDGETS)
+    with pytest.raises(ValueError):
+        analysis_budgets({'max_pages': 3})
+
+
+def test_env_budget_defaults_and_opt_out(monkeypatch):
+    monkeypatch.delenv('ROLEIQ_MAX_BULLETS', raising=False)
+    assert _env_budget('ROLEIQ_MAX_BULLETS', 25) == 25
+    monkeypatch.setenv('ROLEIQ_MAX_BULLETS', '40')
+    assert _env_budget('ROLEIQ_MAX_BULLETS', 25) == 40
+    monkeypatch.setenv('ROLEIQ_MAX_BULLETS', '-1')
+    assert _env_budget('ROLEIQ_MAX_BULLETS', 25) is None
@@ -0,0 +1,34 @@
+from utils.document_cache import CachedDocument, DocumentCache
+
+JD = "Experience:\n" + "Own compensation planning and market pricing for the finance team.\n" * 20 + "Skills:\nExcel, SQL\n"
+
+
+def test_text_alone_is_cached():
+    cache = DocumentCache(disk_path=None)
+    first = CachedDocument(JD, cache)
+    assert not first.cached
+    second = CachedDocument(JD, cache)  # sections() was never called on the first
+    assert second.cached
+    assert second.text == first.text
+
+
+def test_disk_tier_keys_on_the_parse_caps(tmp_path):
+    db = str(tmp_path / 'documents.db')
+    short = CachedDocument(JD, DocumentCache(disk_path=db), max_chars=100)
+
+    # A new process (empty memory tier) with a larger cap must not get the cut text
+    full = CachedDocument(JD, DocumentCache(disk_path=db), max_chars=100000)
+    assert not full.cached
+    assert len(full.text) > len(short.text)
+
+    again = CachedDocument(JD, DocumentCache(disk_path=db), max_chars=100)
+    assert again.cached
+    assert again.text == short.text
+
+
+def test_layout_sections_are_cached_with_the_text():
+    cache = DocumentCache(disk_path=None)
+    parsed = CachedDocument(JD, cache).sections()
+    cached = CachedDocument(JD, cache)
+    assert cached.cached
+    assert cached.sections() == parsed
@@ -0,0 +1,58 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pytest
+import spacy
+import utils.extractor
+import utils.matcher
+import utils.model_cache
+from utils.ontology_index import get_ontology_index
+
+SAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'samples')
+RESUME = os.path.join(SAMPLES, 'Resume2025 copy.docx')
+JD = os.path.join(SAMPLES, 'Compensation Director Job Description.docx')
+SENIORITY = os.path.join(os.path.dirname(SAMPLES), 'ontologies', 'seniority_levels.json')
+ONTOLOGY = ['compensation', 'benefits', 'excel', 'market pricing', 'job architecture', 'salary surveys',
+            'incentive plans', 'analytics', 'leadership', 'workday']
+
+
+class HashModel:
+    """Offline stand-in for the sentence transformer: a fixed random vector per text"""
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        items = [texts] if single else list(texts)
+        vectors = np.array([
+            np.random.default_rng(int(hashlib.md5(text.encode()).hexdigest()[:8], 16)).normal(size=32)
+            for text in items
+        ], dtype=np.float32).reshape(len(items), 32)
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def offline_pipeline(monkeypatch, tmp_path):
+    """match_resume_jd with a blank spaCy pipeline and HashModel instead of downloaded models"""
+    nlp = spacy.blank('en')
+    nlp.add_pipe('sentencizer')
+    model = HashModel()
+    # Preloaded into the process-wide model cache, so every get_nlp/get_embedding_model caller sees them
+    for name, loaded in [('spacy', nlp), ('sentence_transformer', model), ('embedding_model', model)]:
+        monkeypatch.setitem(utils.model_cache._models, name, loaded)
+    monkeypatch.setattr(utils.matcher, 'get_ontology_index',
+                        lambda ontology, model: get_ontology_index(ontology, model, index_dir=str(tmp_path)))
+    # A blank pipeline has no noun chunks; every longer word is a candidate skill
+    monkeypatch.setattr(utils.extractor, '_candidate_skills',
+                        lambda doc: list(dict.fromkeys(t.text.lower() for t in doc if t.is_alpha and len(t) > 3)))
+    return utils.matcher.match_resume_jd
+
+
+def test_result_exposes_the_similarity_matrix(offline_pipeline):
+    result = offline_pipeline(RESUME, JD, ONTOLOGY, SENIORITY)
+    assert 'error' not in result, result
+    similarity = result['comp_details']['similarity']
+    assert set(similarity) == {'resume_skills', 'gaps', 'matrix'}
+    assert len(similarity['matrix']) == len(similarity['resume_skills'])
+    assert all(len(row) == len(similarity['gaps']) for row in similarity['matrix'])
+    assert similarity['resume_skills'] and similarity['gaps']
+    json.dumps(similarity)  # Plain lists and floats
@@ -0,0 +1,63 @@
+from utils.analyzers import calculate_ats_keyword_density, analyze_keyword_placement
+from utils.mention_index import MentionIndex
+from utils.parser import TextDocument
+
+
+def test_mentions_are_word_bounded():
+    mentions = MentionIndex("Excellent Excel skills; advanced excel and mysql", ['excel', 'sql'])
+    assert mentions.count('excel') == 2
+    assert mentions.first('excel') == len("Excellent ")
+    assert 'sql' not in mentions
+    assert mentions.first('sql') == -1
+
+
+def test_multi_word_skills_match_as_phrases():
+    text = "Led project management office.\nProject\nManagement tooling; management of projects"
+    mentions = MentionIndex(text, ['project management', 'management'])
+    assert mentions.count('project management') == 2
+    assert mentions.count('management') == 3
+    start, end = mentions.mentions('project management')[0]
+    assert text[start:end].lower() == 'project management'
+
+
+def test_skills_are_indexed_on_first_query():
+    mentions = MentionIndex("python and sql", ['python'])
+    assert mentions.count('sql') == 1
+    assert mentions.count('python') == 1
+
+
+def test_sentence_ids():
+    mentions = MentionIndex(TextDocument("We use Excel. Nothing here. Excel again and excel."), ['excel'])
+    assert mentions.sentence_ids('excel') == [0, 2]
+    assert [sentence.text for sentence in mentions.sentences('excel')] == ["We use Excel.", "Excel again and excel."]
+
+
+def test_in_section():
+    sections = {
+        'summary': ["Analyst with strong Excel skills"],
+        'experience': ["Built reconciliations in SQL", "Excellent stakeholder reviews"],
+        'skills': ["sql, python"]
+    }
+    text = '\n'.join(item for items in sections.values() for item in items)
+    mentions = MentionIndex(text, ['excel', 'sql', 'python', 'tableau'], sections=sections)
+    assert mentions.in_section('excel', 'summary')
+    assert not mentions.in_section('excel', 'experience', 'skills')  # "excellent" is not a mention
+    assert mentions.in_section('sql', 'experience')
+    assert mentions.sections('sql') == {'experience', 'skills'}
+    assert mentions.sections('tableau') == set()
+    assert not mentions.in_section('python', 'education')  # Unknown sections hold nothing
+
+
+def test_keyword_density_counts_whole_words():
+    result = calculate_ats_keyword_density(
+        "Excellent communicator", "Excel required. Advanced Excel. Excel macros.", ['excel']
+    )
+    assert result['coverage_pct'] == 0
+    assert result['missing_important'] == ['excel']
+
+
+def test_keyword_placement_uses_first_whole_word_mention():
+    text = "excellent record " * 10 + "excel"
+    placement = analyze_keyword_placement(text, ['excel', 'sql'])
+    assert [item['skill'] for item in placement['bottom_third']] == ['excel']
+    assert placement['not_found'] == ['sql']
@@ -0,0 +1,60 @@
+import pytest
+from utils.numeric_signals import numeric_facts, scan_numeric_facts, years_required
+
+
+def _ranges(text):
+    return [fact.value for fact in scan_numeric_facts(text) if fact.kind == 'year_range']
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("2019 - 2023", (2019, None, 2023, None)),
+    ("2020-present", (2020, None, None, None)),
+    ("jan 2014 to dec. 2020", (2014, 1, 2020, 12)),
+    ("2015-17", (2015, None, 2017, None)),
+    ("1998-02", (1998, None, 2002, None)),
+    # clean_text drops en/em dashes
+    ("2012  2018", (2012, None, 2018, None)),
+    ("financial analyst  acme  2015  present", (2015, None, None, None)),
+    ("2015present", (2015, None, None, None)),
+    ("jan 2015  2018", (2015, 1, 2018, None)),
+    ("may 2017  september 2020", (2017, 5, 2020, 9)),
+    ("may 2017 september 2020", (2017, 5, 2020, 9)),
+])
+def test_year_ranges(text, expected):
+    assert _ranges(text) == [expected]
+
+
+@pytest.mark.parametrize('text', ["2015 2018", "2018\n\n2019 audit", "2015presentation", "2015 17"])
+def test_not_year_ranges(text):
+    assert _ranges(text) == []
+
+
+@pytest.mark.parametrize('text', ["led 2020-2022 erp migration", "Finance Team 2019 - 2021", "managed 2019 budget"])
+def test_years_are_not_headcounts(text):
+    assert numeric_facts(text, 'headcount') == []
+
+
+def test_year_range_after_headcount_verb():
+    assert _ranges("led 2020-2022 erp migration") == [(2020, None, 2022, None)]
+    assert _ranges("finance team 2019 - 2021") == [(2019, None, 2021, None)]
+
+
+def test_headcounts():
+    assert [fact.value for fact in numeric_facts("managed 12 people; team of 5; led 40% growth", 'headcount')] == [12, 5]
+
+
+def test_money_and_percent():
+    facts = numeric_facts("Owned a $2.5 million budget and a $500K capex plan; cut costs 25 percent")
+    assert [fact.millions for fact in facts if fact.kind == 'money'] == [2.5, 0.5]
+    assert [fact.value for fact in facts if fact.kind == 'percent'] == [25.0]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("Minimum of 5-7+ years of accounting/finance experience", 5),
+    ("8+ years in audit, at least 5 years managing teams", 8),
+    ("at least 3 years or a minimum of 4 years", 4),
+    ("10 years of experience", 10),
+    ("no requirement stated", None),
+])
+def test_years_required(text, expected):
+    assert years_required(text) == expected
@@ -0,0 +1,57 @@
+import numpy as np
+from utils.analyzers import cluster_skills, detect_skill_redundancies, group_similar_skills
+
+
+def _angles(*degrees):
+    """Unit vectors at the given angles; cosine similarity is the cosine of the angle between them"""
+    return np.array([[np.cos(np.radians(d)), np.sin(np.radians(d))] for d in degrees])
+
+
+def test_clusters_are_transitive():
+    # a~b and b~c are above 0.75 (37 degrees apart) but a~c is not (74 degrees); d is far from all
+    skills = ['ap', 'accounts payable', 'payables processing', 'sql']
+    clusters = cluster_skills(skills, model=None, embeddings=_angles(0, 37, 74, 270))
+    assert clusters == {
+        'payables processing': ['ap', 'accounts payable', 'payables processing'],
+        'sql': ['sql']
+    }
+
+
+def test_redundancies_join_similar_and_contained_names():
+    skills = ['management', 'project management', 'stakeholder management', 'excel', 'ms excel', 'python']
+    redundancies = detect_skill_redundancies(skills, model=None, embeddings=np.eye(len(skills)))
+    assert redundancies == [
+        {'primary': 'stakeholder management', 'duplicates': ['management', 'project management']},
+        {'primary': 'ms excel', 'duplicates': ['excel']}
+    ]
+
+
+def test_redundancies_use_the_similarity_threshold():
+    skills = ['variance analysis', 'budget variance review', 'budgeting']
+    embeddings = _angles(0, 20, 90)  # cos(20 degrees) = 0.94
+    groups = group_similar_skills(skills, model=None, redundancy_threshold=0.85, embeddings=embeddings)
+    assert groups['redundancies'] == [{'primary': 'budget variance review', 'duplicates': ['variance analysis']}]
+    groups = group_similar_skills(skills, model=None, redundancy_threshold=0.95, embeddings=embeddings)
+    assert groups['redundancies'] == []
+
+
+def test_containment_matches_pairwise_check():
+    skills = ['ap', 'a', 'accounts payable', 'payable', 'Payables', 'gaap', 'us gaap', 'tax', 'taxation', 'sql']
+    embeddings = np.eye(len(skills))
+    lowered = [skill.lower() for skill in skills]
+    expected = set()
+    for i in range(len(skills)):
+        for j in range(i + 1, len(skills)):
+            if lowered[i] in lowered[j] or lowered[j] in lowered[i]:
+                expected.add(frozenset((i, j)))
+    grouped = set()
+    for group in detect_skill_redundancies(skills, model=None, embeddings=embeddings):
+        members = [group['primary']] + group['duplicates']
+        grouped.update(frozenset((skills.index(x), skills.index(y))) for x in members for y in members if x != y)
+    # Every contained pair ends up in the same group (groups may also be joined transitively)
+    assert expected <= grouped
+
+
+def test_repeated_skills_share_one_embedding():
+    clusters = cluster_skills(['excel', 'sql', 'excel'], model=None, embeddings=_angles(0, 90, 45))
+    assert clusters == {'excel': ['excel'], 'sql': ['sql']}
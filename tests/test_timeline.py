@@ -0,0 +1,61 @@
+from datetime import datetime
+from utils.analyzers import analyze_experience_progression, check_consistency
+from utils.extractor import extract_seniority
+from utils.parser import clean_text
+from utils.timeline import extract_timeline
+
+NOW = datetime(2026, 1, 1)
+
+
+def test_en_dash_ranges_survive_clean_text():
+    text = clean_text("Senior Accountant, Acme Corp, 2012 – 2018\nAccountant, Foo Inc, 2008 – 2012")
+    timeline = extract_timeline(text, now=NOW)
+    assert [(entry.start_year, entry.end_year) for entry in timeline.entries] == [(2012, 2018), (2008, 2012)]
+    assert timeline.years == 10
+
+
+def test_ongoing_role_after_clean_text():
+    timeline = extract_timeline(clean_text("Financial Analyst – Acme – 2015 – Present"), now=NOW)
+    assert [(entry.start_year, entry.ongoing) for entry in timeline.entries] == [(2015, True)]
+    assert timeline.roles[0].title == 'financial analyst acme'
+
+
+def test_seniority_years_fall_back_to_the_earliest_year():
+    current_year = datetime.now().year
+    cleaned = [clean_text("Senior Accountant acme corp 2012 – 2018 accountant foo inc 2008 – 2012")]
+    assert extract_seniority(cleaned, {})['years'] == current_year - 2008
+    # A year outside any range still bounds the career
+    assert extract_seniority(["Joined Acme in 2010", "Analyst 2016 - 2018"], {})['years'] == current_year - 2010
+
+
+def test_bullets_opening_with_a_verb_are_not_titles():
+    experience = [
+        "Senior Analyst, Acme",
+        "Jan 2016 - Dec 2019",
+        "Director, Global Compensation",
+        "Lead delivery of annual market range refresh process",
+        "Sep 2020 - Present"
+    ]
+    timeline = extract_timeline(experience, now=NOW)
+    assert [entry.title for entry in timeline.roles] == ['Senior Analyst, Acme', 'Director, Global Compensation']
+
+
+def test_lead_as_a_title():
+    timeline = extract_timeline(["Lead Analyst, Acme 2015 - 2018", "Team Lead", "Foo Inc 2018 - 2020"], now=NOW)
+    assert [entry.title for entry in timeline.roles] == ['Lead Analyst, Acme', 'Team Lead']
+
+
+def test_overlapping_roles_count_once():
+    timeline = extract_timeline(["Analyst 2010 - 2014", "Consultant 2012 - 2016"], now=NOW)
+    assert timeline.years == 6
+
+
+def test_progression_and_consistency_read_the_timeline():
+    # Section items are cleaned one by one and joined by lines
+    text = '\n'.join(clean_text(item) for item in [
+        "Analyst, Acme – 2012 – 2015", "Senior Analyst, Acme – 2015 – 2018", "Director, Foo – 2018 – 2021"
+    ])
+    progression = analyze_experience_progression(text, None, extract_timeline(text, now=NOW))
+    assert progression['total_roles'] == 3
+    assert progression['promotions'] == 2
+    assert not any('Senior' in issue for issue in check_consistency(text, None)['consistency_issues'])
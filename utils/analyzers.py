@@ -1,15 +1,27 @@
 """
 Free analysis enhancements using existing NLP tools (no API costs)
 """
+import logging
 import re
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
-from sentence_transformers import util
+import numpy as np
+from utils.mention_index import MentionIndex
+from utils.nlp_context import get_sentences
+from utils.numeric_signals import numeric_facts, years_required
+from utils.ontology_index import cos_sim
+from utils.parser import as_text_document
+from utils.timeline import extract_timeline
+
+logger = logging.getLogger(__name__)
 
 def extract_achievements(text):
     """
     Extract quantifiable achievements from text
     Returns metrics found: dollar amounts, percentages, team sizes, volumes
     """
+    document = as_text_document(text)
+    text = document.text
     achievements = {
         'dollar_amounts': [],
         'percentages': [],
@@ -18,23 +30,15 @@ def extract_achievements(text):
         'timeframes': []
     }
 
-    # Dollar amounts: $5M, $500K, $2.5 million
-    dollar_pattern = re.compile(r'\$\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*([KMB]|million|billion|thousand)?', re.IGNORECASE)
-    for match in dollar_pattern.finditer(text):
-        amount = match.group(1).replace(',', '')
-        unit = match.group(2) or ''
-        achievements['dollar_amounts'].append(f"${amount}{unit}")
-
-    # Percentages: 40%, reduced by 25%
-    pct_pattern = re.compile(r'(\d+(?:\.\d+)?)\s*%|(\d+(?:\.\d+)?)\s*percent', re.IGNORECASE)
-    for match in pct_pattern.finditer(text):
-        pct = match.group(1) or match.group(2)
-        achievements['percentages'].append(f"{pct}%")
-
-    # Team sizes: "team of 12", "managed 5 people", "supervised 3 staff"
-    team_pattern = re.compile(r'(?:team of|managed|supervised|led|mentored|coached)\s+(\d+)\s*(?:people|staff|employees|direct reports|members)?', re.IGNORECASE)
-    for match in team_pattern.finditer(text):
-        achievements['team_sizes'].append(match.group(1))
+    # Dollar amounts ($5M, $500K, $2.5 million), percentages (40%, reduced by 25%)
+    # and team sizes ("team of 12", "managed 5 people") from the shared numeric scan
+    for fact in numeric_facts(document):
+        if fact.kind == 'money':
+            achievements['dollar_amounts'].append(f"${fact.number}{fact.unit}")
+        elif fact.kind == 'percent':
+            achievements['percentages'].append(f"{fact.number}%")
+        elif fact.kind == 'headcount':
+            achievements['team_sizes'].append(fact.number)
 
     # Volumes: "500+ invoices", "50 accounts", "100 transactions"
     volume_pattern = re.compile(r'(\d+)\s*\+?\s*(?:invoices|accounts|transactions|clients|customers|reports|entries)', re.IGNORECASE)
@@ -43,7 +47,7 @@ def extract_achievements(text):
 
     # Timeframes: "daily", "monthly", "quarterly", "annual"
     timeframe_pattern = re.compile(r'\b(daily|weekly|monthly|quarterly|annual|yearly)\b', re.IGNORECASE)
-    achievements['timeframes'] = list(set(timeframe_pattern.findall(text.lower())))
+    achievements['timeframes'] = list(set(timeframe_pattern.findall(document.lower)))
 
     return achievements
 
@@ -122,59 +126,108 @@ def analyze_action_verbs(text, nlp):
     }
 
 
-def cluster_skills(skills, model, similarity_threshold=0.75):
+def _connected_components(n, edges):
+    """Union-find over index pairs; returns components as sorted index lists, ordered by first index"""
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in edges:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    components = defaultdict(list)
+    for i in range(n):
+        components[find(i)].append(i)
+    return list(components.values())
+
+
+def group_similar_skills(skills, model, cluster_threshold=0.75, redundancy_threshold=0.85, embeddings=None):
     """
-    Group similar skills together to reduce false negatives
-    e.g., "accounts payable", "AP", "payables" -> one cluster
+    Skill clusters and redundancies from one similarity matrix
+    The normalized embeddings are multiplied once; pairs above each threshold
+    become graph edges and skills are grouped by connected component.
+    Redundancies also join skills where one name contains the other.
+    embeddings: optional precomputed vectors aligned with skills (skips encoding)
+    Returns: {'clusters': cluster_skills output, 'redundancies': detect_skill_redundancies output}
     """
-    if not skills or len(skills) < 2:
-        return {skill: [skill] for skill in skills}
+    # Repeated names share the embedding of their first occurrence
+    first_index = {}
+    for i, skill in enumerate(skills):
+        first_index.setdefault(skill, i)
+    unique = list(first_index)
+    if len(unique) < 2:
+        return {'clusters': {skill: [skill] for skill in unique}, 'redundancies': []}
+
+    if embeddings is None:
+        embeddings = model.encode(unique)
+    else:
+        embeddings = np.asarray(embeddings)[list(first_index.values())]
 
-    # Encode all skills
-    embeddings = model.encode(skills)
+    similarity = cos_sim(embeddings, embeddings)
+    upper = np.triu(np.ones(similarity.shape, dtype=bool), k=1)
 
-    # Create clusters
+    cluster_edges = zip(*np.nonzero((similarity > cluster_threshold) & upper))
     clusters = {}
-    processed = set()
+    for component in _connected_components(len(unique), cluster_edges):
+        members = [unique[i] for i in component]
+        # Use longest/most specific as cluster key
+        clusters[max(members, key=len)] = members
 
-    for i, skill in enumerate(skills):
-        if skill in processed:
-            continue
+    # contains[i, j]: skill i's name occurs inside skill j's (one vectorized pass over all pairs)
+    lowered = np.array([skill.lower() for skill in unique], dtype=str)
+    contains = np.char.find(lowered[None, :], lowered[:, None]) >= 0
+    redundant = ((similarity > redundancy_threshold) | contains | contains.T) & upper
+    redundancy_edges = zip(*np.nonzero(redundant))
+    redundancies = []
+    for component in _connected_components(len(unique), redundancy_edges):
+        if len(component) > 1:
+            duplicates = [unique[i] for i in component]
+            # Use most specific (longest) as primary
+            primary = max(duplicates, key=len)
+            redundancies.append({
+                'primary': primary,
+                'duplicates': [d for d in duplicates if d != primary]
+            })
 
-        # Find all similar skills
-        similar = [skill]
-        for j, other_skill in enumerate(skills):
-            if i != j and other_skill not in processed:
-                similarity = util.cos_sim(embeddings[i], embeddings[j])[0][0].item()
-                if similarity > similarity_threshold:
-                    similar.append(other_skill)
-                    processed.add(other_skill)
+    return {'clusters': clusters, 'redundancies': redundancies}
 
-        # Use longest/most specific as cluster key
-        cluster_key = max(similar, key=len)
-        clusters[cluster_key] = similar
-        processed.add(skill)
 
-    return clusters
+def cluster_skills(skills, model, similarity_threshold=0.75, embeddings=None):
+    """
+    Group similar skills together to reduce false negatives
+    e.g., "accounts payable", "AP", "payables" -> one cluster
+    embeddings: optional precomputed vectors aligned with skills (skips encoding)
+    """
+    if not skills or len(skills) < 2:
+        return {skill: [skill] for skill in skills}
+    return group_similar_skills(skills, model, cluster_threshold=similarity_threshold, embeddings=embeddings)['clusters']
 
 
-def calculate_ats_keyword_density(resume_text, jd_text, jd_skills):
+def calculate_ats_keyword_density(resume_text, jd_text, jd_skills, resume_mentions=None, jd_mentions=None):
     """
     Calculate how well resume covers JD keywords (for ATS optimization)
+    resume_text/jd_text may be strings or TextDocuments; resume_mentions/jd_mentions
+    are MentionIndexes over them, built here when not passed
     """
-    resume_lower = resume_text.lower()
-    jd_lower = jd_text.lower()
+    if resume_mentions is None:
+        resume_mentions = MentionIndex(resume_text, jd_skills)
+    if jd_mentions is None:
+        jd_mentions = MentionIndex(jd_text, jd_skills)
 
     # Count keyword occurrences
     keyword_coverage = {}
     for skill in jd_skills:
-        skill_lower = skill.lower()
-
         # Count in resume
-        resume_count = resume_lower.count(skill_lower)
+        resume_count = resume_mentions.count(skill)
 
         # Count in JD (to understand importance)
-        jd_count = jd_lower.count(skill_lower)
+        jd_count = jd_mentions.count(skill)
 
         keyword_coverage[skill] = {
             'resume_mentions': resume_count,
@@ -245,7 +298,6 @@ def detect_leadership_language(text, nlp):
     """
     Identify leadership signals in text
     """
-    doc = nlp(text)
     text_lower = text.lower()
 
     signals = {
@@ -324,8 +376,7 @@ def classify_task_vs_outcome(text, nlp):
     """
     Classify resume bullets as task-oriented vs outcome-oriented
     """
-    doc = nlp(text)
-    sentences = [sent.text.strip() for sent in doc.sents]
+    sentences = [sent.text.strip() for sent in get_sentences(text, nlp)]
 
     classifications = []
 
@@ -404,19 +455,22 @@ def classify_task_vs_outcome(text, nlp):
     }
 
 
-def score_resume_sections(resume_sections, jd_skills, nlp):
+def score_resume_sections(resume_sections, jd_skills, nlp, mentions=None):
     """
     Score each resume section on 1-10 scale
+    mentions: MentionIndex over the resume built with sections=resume_sections
     Returns: section scores and specific improvement recommendations
     """
+    if mentions is None:
+        section_text = '\n'.join(item for items in resume_sections.values() for item in items)
+        mentions = MentionIndex(section_text, jd_skills, sections=resume_sections)
     scores = {}
 
     # Score Summary/Objective section (if exists)
     summary_text = ' '.join(resume_sections.get('summary', []) + resume_sections.get('objective', []))
     if summary_text:
         # Check if key JD skills appear in summary
-        summary_lower = summary_text.lower()
-        skills_in_summary = sum(1 for skill in jd_skills if skill.lower() in summary_lower)
+        skills_in_summary = sum(1 for skill in jd_skills if mentions.in_section(skill, 'summary', 'objective'))
         coverage_pct = (skills_in_summary / len(jd_skills) * 100) if jd_skills else 0
 
         # Score based on coverage and length
@@ -446,8 +500,7 @@ def score_resume_sections(resume_sections, jd_skills, nlp):
         verb_count = sum(1 for token in doc if token.pos_ == 'VERB' and token.lemma_.lower() in strong_verbs)
 
         # Check skill coverage
-        exp_lower = experience_text.lower()
-        skills_in_exp = sum(1 for skill in jd_skills if skill.lower() in exp_lower)
+        skills_in_exp = sum(1 for skill in jd_skills if mentions.in_section(skill, 'experience'))
         skill_coverage_pct = (skills_in_exp / len(jd_skills) * 100) if jd_skills else 0
 
         # Calculate score
@@ -470,8 +523,7 @@ def score_resume_sections(resume_sections, jd_skills, nlp):
     # Score Skills section
     skills_text = ' '.join(resume_sections.get('skills', []))
     if skills_text:
-        skills_lower = skills_text.lower()
-        skills_in_section = sum(1 for skill in jd_skills if skill.lower() in skills_lower)
+        skills_in_section = sum(1 for skill in jd_skills if mentions.in_section(skill, 'skills'))
         coverage_pct = (skills_in_section / len(jd_skills) * 100) if jd_skills else 0
 
         # Score based on coverage
@@ -548,50 +600,15 @@ def generate_skills_recommendation(score, skills_mentioned, jd_skills):
         return f"Add {missing} missing JD skills to Skills section: {', '.join(missing_skills[:3])}."
 
 
-def detect_skill_redundancies(skills, model, similarity_threshold=0.85):
+def detect_skill_redundancies(skills, model, similarity_threshold=0.85, embeddings=None):
     """
     Find duplicate or highly similar skills in a list
     Returns: groups of redundant skills that should be consolidated
+    embeddings: optional precomputed vectors aligned with skills (skips encoding)
     """
     if not skills or len(skills) < 2:
         return []
-
-    redundancies = []
-    processed = set()
-
-    # Encode all skills
-    embeddings = model.encode(skills)
-
-    for i, skill in enumerate(skills):
-        if skill in processed:
-            continue
-
-        duplicates = [skill]
-
-        for j, other_skill in enumerate(skills):
-            if i != j and other_skill not in processed:
-                # Check exact substring match
-                if skill.lower() in other_skill.lower() or other_skill.lower() in skill.lower():
-                    duplicates.append(other_skill)
-                    processed.add(other_skill)
-                else:
-                    # Check semantic similarity
-                    similarity = util.cos_sim(embeddings[i], embeddings[j])[0][0].item()
-                    if similarity > similarity_threshold:
-                        duplicates.append(other_skill)
-                        processed.add(other_skill)
-
-        if len(duplicates) > 1:
-            # Use most specific (longest) as primary
-            primary = max(duplicates, key=len)
-            redundancies.append({
-                'primary': primary,
-                'duplicates': [d for d in duplicates if d != primary]
-            })
-
-        processed.add(skill)
-
-    return redundancies
+    return group_similar_skills(skills, model, redundancy_threshold=similarity_threshold, embeddings=embeddings)['redundancies']
 
 
 def classify_hard_vs_soft_skills(skills):
@@ -660,51 +677,50 @@ def classify_hard_vs_soft_skills(skills):
     return categorized
 
 
-def extract_skill_context(resume_text, jd_text, gaps, model, nlp):
+def extract_skill_context(resume_text, jd_text, gaps, model, nlp, jd_mentions=None, max_gaps=None):
     """
     For each gap, extract surrounding context from JD and closest match from resume
     Helps validate whether gaps are real or false positives
+    jd_mentions: MentionIndex over the JD (built with nlp so sentence ids follow its parse)
+    max_gaps: optional budget on the gaps analyzed (default: all)
     """
+    gaps = gaps[:max_gaps] if max_gaps is not None else gaps
     if not gaps:
         return {}
+    if jd_mentions is None:
+        jd_mentions = MentionIndex(jd_text, gaps, nlp=nlp)
 
     # Split texts into sentences
-    resume_doc = nlp(resume_text)
-    jd_doc = nlp(jd_text)
-
-    resume_sentences = [sent.text.strip() for sent in resume_doc.sents]
-    jd_sentences = [sent.text.strip() for sent in jd_doc.sents]
-
-    # Encode sentences
-    resume_embs = model.encode(resume_sentences) if resume_sentences else []
-    jd_embs = model.encode(jd_sentences) if jd_sentences else []
+    resume_sentences = [sent.text.strip() for sent in get_sentences(resume_text, nlp)]
+    jd_sentences = [sent.text for sent in jd_mentions.document.sentences]
+
+    # JD sentences mentioning each gap
+    gap_sentence_ids = {gap: jd_mentions.sentence_ids(gap) for gap in gaps}
+
+    # Only the first JD sentence per gap is compared, so only those are encoded,
+    # in one batch, and matched against every resume sentence in one product
+    context_ids = list(dict.fromkeys(ids[0] for ids in gap_sentence_ids.values() if ids))
+    best_matches = {}
+    if context_ids and resume_sentences:
+        resume_embs = model.encode(resume_sentences)
+        jd_embs = model.encode([jd_sentences[i] for i in context_ids])
+        similarities = cos_sim(jd_embs, resume_embs)
+        best = similarities.argmax(axis=1)
+        for row, jd_idx in enumerate(context_ids):
+            best_matches[jd_idx] = (int(best[row]), float(similarities[row, best[row]]))
 
     context_data = {}
 
-    for gap in gaps[:10]:  # Limit to first 10 gaps to avoid performance issues
-        gap_lower = gap.lower()
-
-        # Find JD sentences mentioning this gap
-        jd_context_sentences = []
-        for i, jd_sent in enumerate(jd_sentences):
-            if gap_lower in jd_sent.lower():
-                jd_context_sentences.append({
-                    'sentence': jd_sent,
-                    'index': i
-                })
+    for gap in gaps:
+        jd_context_sentences = [
+            {'sentence': jd_sentences[i], 'index': i}
+            for i in gap_sentence_ids[gap]
+        ]
 
-        # Find closest resume sentence to the JD context
+        # Closest resume sentence to the first JD sentence mentioning the gap
         closest_resume_match = None
-        if jd_context_sentences and len(resume_embs) > 0:
-            # Use first JD sentence mentioning the gap
-            jd_idx = jd_context_sentences[0]['index']
-            jd_emb = jd_embs[jd_idx]
-
-            # Find most similar resume sentence
-            similarities = util.cos_sim(jd_emb, resume_embs)[0]
-            best_match_idx = similarities.argmax().item()
-            similarity_score = similarities[best_match_idx].item()
-
+        if jd_context_sentences and jd_context_sentences[0]['index'] in best_matches:
+            best_match_idx, similarity_score = best_matches[jd_context_sentences[0]['index']]
             closest_resume_match = {
                 'sentence': resume_sentences[best_match_idx],
                 'similarity': round(similarity_score, 3)
@@ -721,42 +737,17 @@ def extract_skill_context(resume_text, jd_text, gaps, model, nlp):
 
 # ==================== TIER 3 ENHANCEMENTS ====================
 
-def analyze_experience_progression(resume_text, nlp):
+def analyze_experience_progression(resume_text, nlp, timeline=None):
     """
     Analyze career trajectory and progression over time
     Detects: promotions, scope increases, career gaps, lateral moves
+    timeline: CareerTimeline of the resume (utils/timeline), built from resume_text when not passed
     """
-    doc = nlp(resume_text)
-
-    # Extract job titles and dates
-    job_entries = []
-
-    # Look for patterns like "2020-2023", "Jan 2020 - Present", etc.
-    date_pattern = re.compile(r'(20\d{2})\s*[-–]\s*(20\d{2}|present|current)', re.IGNORECASE)
-
-    # Split into lines for better parsing
-    lines = resume_text.split('\n')
-
-    current_entry = {}
-    for line in lines:
-        # Look for job titles (usually uppercase or title case)
-        if len(line.split()) <= 6 and any(word[0].isupper() for word in line.split() if word):
-            # Potential title
-            if 'manager' in line.lower() or 'director' in line.lower() or 'senior' in line.lower() or 'lead' in line.lower() or 'analyst' in line.lower() or 'controller' in line.lower():
-                current_entry['title'] = line.strip()
+    if timeline is None:
+        timeline = extract_timeline(resume_text)
 
-        # Look for dates
-        date_match = date_pattern.search(line)
-        if date_match:
-            start_year = int(date_match.group(1))
-            end_year = 2025 if date_match.group(2).lower() in ['present', 'current'] else int(date_match.group(2))
-            current_entry['start_year'] = start_year
-            current_entry['end_year'] = end_year
-            current_entry['duration'] = end_year - start_year
-
-            if current_entry.get('title'):
-                job_entries.append(current_entry.copy())
-                current_entry = {}
+    # Roles with a title, ordered by start date
+    job_entries = timeline.roles
 
     # Analyze progression
     progression_data = {
@@ -769,34 +760,20 @@ def analyze_experience_progression(resume_text, nlp):
     }
 
     if len(job_entries) >= 2:
-        # Sort by start year
-        job_entries.sort(key=lambda x: x.get('start_year', 0))
-
         # Calculate average tenure
-        tenures = [e['duration'] for e in job_entries if e.get('duration')]
-        progression_data['avg_tenure'] = sum(tenures) / len(tenures) if tenures else 0
-
-        # Detect promotions (seniority words appearing later)
-        seniority_levels = ['analyst', 'associate', 'specialist', 'coordinator', 'senior', 'lead', 'manager', 'director', 'vp', 'chief']
-
-        for i in range(1, len(job_entries)):
-            prev_title = job_entries[i-1].get('title', '').lower()
-            curr_title = job_entries[i].get('title', '').lower()
+        tenures = [entry.duration for entry in job_entries if entry.duration]
+        progression_data['avg_tenure'] = round(sum(tenures) / len(tenures), 1) if tenures else 0
 
-            # Check for seniority increase
-            prev_level = max([seniority_levels.index(word) for word in seniority_levels if word in prev_title] or [0])
-            curr_level = max([seniority_levels.index(word) for word in seniority_levels if word in curr_title] or [0])
-
-            if curr_level > prev_level:
+        for prev, curr in zip(job_entries, job_entries[1:]):
+            # Check for seniority increase (title levels from the timeline)
+            if curr.level > prev.level:
                 progression_data['promotions'] += 1
-            elif curr_level == prev_level:
+            elif curr.level == prev.level:
                 progression_data['lateral_moves'] += 1
 
-            # Detect career gaps (>6 months between roles)
-            prev_end = job_entries[i-1].get('end_year', 0)
-            curr_start = job_entries[i].get('start_year', 0)
-            if curr_start - prev_end > 0:
-                progression_data['career_gaps'].append(f"{prev_end}-{curr_start}")
+            # Detect career gaps (a year or more between roles)
+            if curr.start_year - prev.end_year > 0:
+                progression_data['career_gaps'].append(f"{prev.end_year}-{curr.start_year}")
 
         # Overall progression quality
         if progression_data['promotions'] >= 2:
@@ -860,7 +837,7 @@ def calculate_readability_score(resume_text, nlp):
     Measures: readability, passive voice, jargon density, sentence length
     """
     doc = nlp(resume_text)
-    sentences = list(doc.sents)
+    sentences = get_sentences(resume_text, nlp)
 
     if not sentences:
         return {'readability_score': 0, 'issues': []}
@@ -933,39 +910,13 @@ def infer_scope_level(resume_text, jd_text):
     Infer scope and seniority level from quantifiable metrics
     Compares resume scope vs JD requirements
     """
-    # Extract budget/financial scope
-    budget_pattern = re.compile(r'\$\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*([KMB]|million|billion|thousand)?', re.IGNORECASE)
-
-    resume_budgets = []
-    for match in budget_pattern.finditer(resume_text):
-        amount = float(match.group(1).replace(',', ''))
-        unit = match.group(2) or ''
-
-        # Convert to millions
-        if 'k' in unit.lower() or 'thousand' in unit.lower():
-            amount = amount / 1000
-        elif 'b' in unit.lower() or 'billion' in unit.lower():
-            amount = amount * 1000
-
-        resume_budgets.append(amount)
-
-    jd_budgets = []
-    for match in budget_pattern.finditer(jd_text):
-        amount = float(match.group(1).replace(',', ''))
-        unit = match.group(2) or ''
-
-        if 'k' in unit.lower() or 'thousand' in unit.lower():
-            amount = amount / 1000
-        elif 'b' in unit.lower() or 'billion' in unit.lower():
-            amount = amount * 1000
-
-        jd_budgets.append(amount)
+    # Extract budget/financial scope (in millions)
+    resume_budgets = [fact.millions for fact in numeric_facts(resume_text, 'money')]
+    jd_budgets = [fact.millions for fact in numeric_facts(jd_text, 'money')]
 
     # Extract team sizes
-    team_pattern = re.compile(r'(?:team of|managed|supervised|led)\s+(\d+)', re.IGNORECASE)
-
-    resume_teams = [int(m.group(1)) for m in team_pattern.finditer(resume_text)]
-    jd_teams = [int(m.group(1)) for m in team_pattern.finditer(jd_text)]
+    resume_teams = [fact.value for fact in numeric_facts(resume_text, 'headcount')]
+    jd_teams = [fact.value for fact in numeric_facts(jd_text, 'headcount')]
 
     # Determine scope levels
     def get_scope_level(budgets, teams):
@@ -1002,55 +953,41 @@ def infer_scope_level(resume_text, jd_text):
     }
 
 
-def check_consistency(resume_text, nlp):
+def check_consistency(resume_text, nlp, timeline=None):
     """
     Detect inconsistencies and contradictions in resume
     Checks: title vs responsibilities, claimed seniority vs evidence
+    timeline: CareerTimeline of the resume (utils/timeline), built from resume_text when not passed
     """
-    doc = nlp(resume_text)
+    document = as_text_document(resume_text, nlp)
     issues = []
 
-    # Extract job titles
-    titles = []
-    title_keywords = ['manager', 'director', 'senior', 'lead', 'analyst', 'controller', 'supervisor', 'coordinator']
-
-    for sent in doc.sents:
-        sent_text = sent.text.lower()
-        for keyword in title_keywords:
-            if keyword in sent_text:
-                titles.append((keyword, sent.text))
-                break
+    # Title words and roles from the career timeline
+    if timeline is None:
+        timeline = extract_timeline(document)
+    title_words = {title.word for title in timeline.titles}
 
     # Check for management titles without team mentions
-    mgmt_titles = ['manager', 'director', 'supervisor', 'lead']
-    has_mgmt_title = any(title[0] in mgmt_titles for title in titles)
+    mgmt_titles = {'manager', 'director', 'supervisor', 'lead', 'head of', 'vp', 'vice president'}
+    has_mgmt_title = bool(title_words & mgmt_titles)
 
-    team_pattern = re.compile(r'(?:team|managed|supervised|led|mentored)\s+\d+|team of', re.IGNORECASE)
-    has_team_mention = bool(team_pattern.search(resume_text))
+    has_team_mention = bool(numeric_facts(document, 'headcount')) or 'team of' in document
 
     if has_mgmt_title and not has_team_mention:
         issues.append("Title includes 'Manager/Director' but no team management mentioned. Add team size or remove management title.")
 
     # Check for "Senior" title without years of experience
-    has_senior_title = any('senior' in title[0] for title in titles)
-
-    # Count years (rough estimate)
-    year_pattern = re.compile(r'(20\d{2})\s*[-–]\s*(20\d{2}|present)', re.IGNORECASE)
-    years_found = year_pattern.findall(resume_text)
+    has_senior_title = bool(title_words & {'senior', 'sr.'})
 
-    total_years = 0
-    for start, end in years_found:
-        start_year = int(start)
-        end_year = 2025 if end.lower() == 'present' else int(end)
-        total_years += (end_year - start_year)
+    # Years covered by the roles' date ranges
+    total_years = timeline.years
 
     if has_senior_title and total_years < 5:
         issues.append("Title includes 'Senior' but less than 5 years experience shown. Add more experience or adjust title.")
 
     # Check for budget responsibility claims without dollar amounts
-    if 'budget' in resume_text.lower():
-        budget_pattern = re.compile(r'\$\s*\d+', re.IGNORECASE)
-        if not budget_pattern.search(resume_text):
+    if 'budget' in document:
+        if not numeric_facts(document, 'money'):
             issues.append("'Budget' mentioned but no dollar amounts provided. Quantify budget responsibility.")
 
     return {'consistency_issues': issues[:3]}  # Top 3 issues
@@ -1058,25 +995,49 @@ def check_consistency(resume_text, nlp):
 
 # ==================== TIER 4 ENHANCEMENTS ====================
 
-def score_gap_severity(gaps, jd_text):
+_REQUIRED_BEFORE = re.compile(r'required|must have|essential')
+_REQUIRED_AFTER = re.compile(r'required|essential|critical')
+
+
+def _marked_required(jd_lower, start, end, marker_ends, marker_starts):
+    """True if a requirement marker precedes or follows the mention at start:end on the same line"""
+    i = bisect_right(marker_ends, start) - 1
+    if i >= 0 and jd_lower.find('\n', marker_ends[i], start) == -1:
+        return True
+    i = bisect_left(marker_starts, end)
+    return i < len(marker_starts) and jd_lower.find('\n', end, marker_starts[i]) == -1
+
+
+def score_gap_severity(gaps, jd_text, jd_mentions=None):
     """
     Score each gap 1-10 based on importance signals in JD
     Factors: frequency, position in JD, appears in requirements, marked as required
+    jd_mentions: MentionIndex over the JD, built here when not passed
     Returns: prioritized gaps with severity scores
     """
     if not gaps:
         return []
 
-    jd_lower = jd_text.lower()
+    if jd_mentions is None:
+        jd_mentions = MentionIndex(jd_text, gaps)
+    jd_lower = jd_mentions.document.lower
     gap_scores = []
 
+    # Requirement keywords are located once; each gap only compares offsets against them
+    requirements_keywords = ['required', 'must have', 'qualifications', 'requirements', 'essential']
+    keyword_positions = [(keyword, jd_lower.find(keyword)) for keyword in requirements_keywords]
+    keyword_positions = [(keyword, idx) for keyword, idx in keyword_positions if idx != -1]
+    marker_ends = [m.end() for m in _REQUIRED_BEFORE.finditer(jd_lower)]
+    marker_starts = [m.start() for m in _REQUIRED_AFTER.finditer(jd_lower)]
+
     for gap in gaps:
         gap_lower = gap.lower()
         score = 5  # Base score
         signals = []
+        mentions = jd_mentions.mentions(gap)
 
         # Factor 1: Frequency in JD (how many times mentioned)
-        frequency = jd_lower.count(gap_lower)
+        frequency = len(mentions)
         if frequency >= 4:
             score += 3
             signals.append(f"mentioned {frequency}x in JD")
@@ -1087,7 +1048,7 @@ def score_gap_severity(gaps, jd_text):
             score += 0
 
         # Factor 2: Position in JD (appears in first 25% = high priority)
-        first_occurrence = jd_lower.find(gap_lower)
+        first_occurrence = jd_mentions.first(gap)
         if first_occurrence != -1:
             position_pct = (first_occurrence / len(jd_lower)) * 100
             if position_pct <= 25:
@@ -1095,30 +1056,18 @@ def score_gap_severity(gaps, jd_text):
                 signals.append("appears early in JD")
 
         # Factor 3: Appears in requirements/qualifications section
-        requirements_keywords = ['required', 'must have', 'qualifications', 'requirements', 'essential']
-        for keyword in requirements_keywords:
-            # Find the keyword section
-            keyword_idx = jd_lower.find(keyword)
-            if keyword_idx != -1:
-                # Check if gap appears within 500 chars after the keyword
-                section = jd_lower[keyword_idx:keyword_idx+500]
-                if gap_lower in section:
-                    score += 2
-                    signals.append(f"in {keyword} section")
-                    break
+        for keyword, keyword_idx in keyword_positions:
+            # Check if gap appears within 500 chars after the keyword
+            if any(keyword_idx <= start and end <= keyword_idx + 500 for start, end in mentions):
+                score += 2
+                signals.append(f"in {keyword} section")
+                break
 
         # Factor 4: Marked as "required" or "must have"
-        # Look for patterns like "required: X, Y, Z" or "must have X"
-        context_patterns = [
-            rf'(?:required|must have|essential).*?{re.escape(gap_lower)}',
-            rf'{re.escape(gap_lower)}.*?(?:required|essential|critical)'
-        ]
-
-        for pattern in context_patterns:
-            if re.search(pattern, jd_lower):
-                score += 1
-                signals.append("marked as required")
-                break
+        # Patterns like "required: X, Y, Z", "must have X" or "X is essential", on the same line
+        if any(_marked_required(jd_lower, start, end, marker_ends, marker_starts) for start, end in mentions):
+            score += 1
+            signals.append("marked as required")
 
         # Factor 5: Certification or specific credential
         if any(cert in gap_lower for cert in ['cpa', 'cfa', 'certified', 'license', 'certification']):
@@ -1152,29 +1101,50 @@ def score_gap_severity(gaps, jd_text):
     return gap_scores
 
 
-def assess_skill_evidence(resume_text, resume_skills, nlp):
+_EVIDENCE_METRIC = re.compile(r'\d+%|\$\d+|\d+\s*(?:percent|million|thousand)')
+_OUTCOME_VERBS = ['increased', 'decreased', 'improved', 'reduced', 'achieved', 'delivered', 'generated']
+_LEADERSHIP_WORDS = ['led', 'managed', 'directed', 'owned', 'established']
+
+
+def assess_skill_evidence(resume_text, resume_skills, nlp, mentions=None, max_skills=None):
     """
     For each skill claimed in resume, assess quality of evidence (1-10)
     Strong evidence: specific examples, metrics, outcomes
     Weak evidence: just listed in skills section, no context
+    mentions: MentionIndex over the resume (built with nlp so sentences follow its parse)
+    max_skills: optional budget on the skills assessed (default: all)
     """
-    if not resume_skills:
+    skills = resume_skills[:max_skills] if max_skills is not None else resume_skills
+    if not skills:
         return []
-
-    doc = nlp(resume_text)
-    sentences = [sent.text for sent in doc.sents]
+    if mentions is None:
+        mentions = MentionIndex(resume_text, skills, nlp=nlp)
+
+    # Evidence signals are computed once per sentence and shared by every skill mentioned in it
+    sentence_signals = {}
+
+    def signals(i):
+        if i not in sentence_signals:
+            sentence = mentions.document.sentences[i].text
+            sentence_lower = sentence.lower()
+            sentence_signals[i] = (
+                bool(_EVIDENCE_METRIC.search(sentence)),
+                any(verb in sentence_lower for verb in _OUTCOME_VERBS),
+                len(sentence.split()) > 15,
+                any(word in sentence_lower for word in _LEADERSHIP_WORDS)
+            )
+        return sentence_signals[i]
 
     skill_evidence_scores = []
 
-    for skill in resume_skills[:15]:  # Limit to top 15 skills for performance
-        skill_lower = skill.lower()
+    for skill in skills:
         evidence_score = 0
         evidence_details = []
 
         # Find all sentences mentioning this skill
-        relevant_sentences = [s for s in sentences if skill_lower in s.lower()]
+        relevant_signals = [signals(i) for i in mentions.sentence_ids(skill)]
 
-        if not relevant_sentences:
+        if not relevant_signals:
             # Skill mentioned but no context (likely just in skills list)
             skill_evidence_scores.append({
                 'skill': skill,
@@ -1188,37 +1158,29 @@ def assess_skill_evidence(resume_text, resume_skills, nlp):
         evidence_score = 3
 
         # Check for quantified achievements related to this skill
-        for sentence in relevant_sentences:
-            # Has numbers/metrics
-            if re.search(r'\d+%|\$\d+|\d+\s*(?:percent|million|thousand)', sentence):
-                evidence_score += 2
-                evidence_details.append('Quantified with metrics')
-                break
+        if any(has_metric for has_metric, _, _, _ in relevant_signals):
+            evidence_score += 2
+            evidence_details.append('Quantified with metrics')
 
         # Check for outcome language
-        outcome_verbs = ['increased', 'decreased', 'improved', 'reduced', 'achieved', 'delivered', 'generated']
-        for sentence in relevant_sentences:
-            if any(verb in sentence.lower() for verb in outcome_verbs):
-                evidence_score += 2
-                evidence_details.append('Shows outcomes/results')
-                break
+        if any(has_outcome for _, has_outcome, _, _ in relevant_signals):
+            evidence_score += 2
+            evidence_details.append('Shows outcomes/results')
 
         # Check for specific examples (project names, tools, processes)
-        has_specifics = any(len(sentence.split()) > 15 for sentence in relevant_sentences)
-        if has_specifics:
+        if any(is_detailed for _, _, is_detailed, _ in relevant_signals):
             evidence_score += 1
             evidence_details.append('Detailed examples provided')
 
         # Check for leadership context
-        leadership_words = ['led', 'managed', 'directed', 'owned', 'established']
-        if any(word in ' '.join(relevant_sentences).lower() for word in leadership_words):
+        if any(has_leadership for _, _, _, has_leadership in relevant_signals):
             evidence_score += 1
             evidence_details.append('Leadership context')
 
         # Check for multiple mentions (skill used throughout resume)
-        if len(relevant_sentences) >= 3:
+        if len(relevant_signals) >= 3:
             evidence_score += 1
-            evidence_details.append(f'Mentioned {len(relevant_sentences)} times')
+            evidence_details.append(f'Mentioned {len(relevant_signals)} times')
 
         # Cap at 10
         evidence_score = min(10, evidence_score)
@@ -1236,7 +1198,7 @@ def assess_skill_evidence(resume_text, resume_skills, nlp):
             'evidence_score': evidence_score,
             'quality': quality,
             'evidence_details': evidence_details,
-            'mentions': len(relevant_sentences)
+            'mentions': len(relevant_signals)
         })
 
     # Sort by evidence score ascending (weakest first)
@@ -1245,18 +1207,22 @@ def assess_skill_evidence(resume_text, resume_skills, nlp):
     return skill_evidence_scores
 
 
-def analyze_keyword_placement(resume_text, jd_skills):
+def analyze_keyword_placement(resume_text, jd_skills, mentions=None, max_skills=None):
     """
     Analyze WHERE critical keywords appear in resume
     Top 25% = excellent (ATS and human readers see it)
     Middle 50% = okay
     Bottom 25% = buried (ATS might miss it)
+    mentions: MentionIndex over the resume, built here when not passed
+    max_skills: optional budget on the JD skills placed (default: all)
     """
-    if not jd_skills:
+    skills = jd_skills[:max_skills] if max_skills is not None else jd_skills
+    if not skills:
         return {}
 
-    resume_lower = resume_text.lower()
-    resume_length = len(resume_lower)
+    if mentions is None:
+        mentions = MentionIndex(resume_text, skills)
+    resume_length = len(mentions.document)
 
     placement_analysis = {
         'top_third': [],
@@ -1266,11 +1232,9 @@ def analyze_keyword_placement(resume_text, jd_skills):
         'buried_critical': []  # Critical skills in bottom third
     }
 
-    for skill in jd_skills[:20]:  # Top 20 JD skills
-        skill_lower = skill.lower()
-
+    for skill in skills:
         # Find first occurrence
-        first_idx = resume_lower.find(skill_lower)
+        first_idx = mentions.first(skill)
 
         if first_idx == -1:
             placement_analysis['not_found'].append(skill)
@@ -1296,9 +1260,6 @@ def analyze_keyword_placement(resume_text, jd_skills):
             })
 
     # Identify critical skills that are buried
-    # Critical = appears 3+ times in JD or in first 25% of JD
-    jd_lower = resume_text.lower()  # Note: This should be jd_text but we don't have it here
-
     for skill_data in placement_analysis['bottom_third']:
         skill = skill_data['skill']
         # If it's in bottom third, flag as buried
@@ -1307,14 +1268,16 @@ def analyze_keyword_placement(resume_text, jd_skills):
     return placement_analysis
 
 
-def score_resume_bullets(resume_text, nlp):
+def score_resume_bullets(resume_text, nlp, max_bullets=None):
     """
     Score each resume bullet/sentence on 1-10 scale
     Factors: strong verb, quantification, outcome language, specificity
+    max_bullets: optional budget on the bullets scored, in resume order (default: all)
     Returns: scored bullets with specific improvement suggestions
     """
-    doc = nlp(resume_text)
-    sentences = [sent for sent in doc.sents if len(sent.text.split()) >= 5]  # Filter short sentences
+    sentences = [sent for sent in get_sentences(resume_text, nlp) if len(sent.text.split()) >= 5]  # Filter short sentences
+    if max_bullets is not None:
+        sentences = sentences[:max_bullets]
 
     bullet_scores = []
 
@@ -1330,7 +1293,7 @@ def score_resume_bullets(resume_text, nlp):
         'participated', 'contributed', 'did', 'performed'
     }
 
-    for sent in sentences[:25]:  # Analyze top 25 bullets
+    for sent in sentences:
         text = sent.text.strip()
         text_lower = text.lower()
         score = 0
@@ -1444,8 +1407,8 @@ def validate_education_requirements(resume_text, jd_text):
     Detects: degree level, field of study, GPA requirements
     Returns: education gaps with severity (DEALBREAKER vs PREFERENCE)
     """
-    resume_lower = resume_text.lower()
-    jd_lower = jd_text.lower()
+    resume_lower = as_text_document(resume_text).lower
+    jd_lower = as_text_document(jd_text).lower
 
     education_gaps = {
         'degree_level_gap': None,
@@ -1607,16 +1570,8 @@ def validate_years_experience(resume_years, jd_text):
     Detects: minimum years required, overqualification
     Returns: experience gap with severity
     """
-    jd_lower = jd_text.lower()
-
-    # Write debug to file to bypass any caching/buffering issues
-    import datetime
-    with open('/tmp/workalign_debug.log', 'a') as f:
-        f.write(f"\n{'='*80}\n")
-        f.write(f"DEBUG validate_years_experience() - {datetime.datetime.now()}\n")
-        f.write(f"Resume years: {resume_years}\n")
-        f.write(f"JD text snippet: {jd_lower[:300]}\n")
-        f.write(f"{'='*80}\n")
+    jd_lower = as_text_document(jd_text).lower
+    logger.debug("validate_years_experience: resume years %s, JD text snippet: %s", resume_years, jd_lower[:300])
 
     experience_validation = {
         'meets_minimum': True,
@@ -1627,54 +1582,13 @@ def validate_years_experience(resume_years, jd_text):
     }
 
     # COMPREHENSIVE APPROACH: First extract ALL year mentions, then parse them
-    min_years_required = None
-
-    # Strategy 1: Look for explicit ranges with various formats
-    # Matches: "5-7 years", "5 - 7 years", "5 to 7 years", "5–7 years"
-    range_pattern = r'(\d+)\s*(?:[-–—]|to)\s*(\d+)\s*(?:\+)?\s*years?'
-    range_match = re.search(range_pattern, jd_lower)
-
-    with open('/tmp/workalign_debug.log', 'a') as f:
-        f.write(f"Testing range pattern: {range_pattern}\n")
-
-    if range_match:
-        with open('/tmp/workalign_debug.log', 'a') as f:
-            f.write(f"Range pattern MATCHED!\n")
-            f.write(f"  Full match: '{range_match.group()}'\n")
-            f.write(f"  Group 1: '{range_match.group(1)}'\n")
-            f.write(f"  Group 2: '{range_match.group(2)}'\n")
-        # Found a range - use the minimum value
-        min_val = int(range_match.group(1))
-        max_val = int(range_match.group(2))
-        min_years_required = min(min_val, max_val)
-        with open('/tmp/workalign_debug.log', 'a') as f:
-            f.write(f"  Result: min({min_val}, {max_val}) = {min_years_required}\n")
-    else:
-        with open('/tmp/workalign_debug.log', 'a') as f:
-            f.write(f"Range pattern did NOT match\n")
-        # Strategy 2: Look for single values with common patterns
-        # Prioritize patterns that indicate requirements
-        single_patterns = [
-            r'(\d+)\+\s*years?',  # "5+ years"
-            r'minimum\s+(?:of\s+)?(\d+)\s*years?',  # "minimum 5 years"
-            r'at\s+least\s+(\d+)\s*years?',  # "at least 5 years"
-            r'(\d+)\s*years?\s+(?:of\s+)?(?:experience|exp)',  # "5 years of experience"
-        ]
-
-        for pattern in single_patterns:
-            matches = re.findall(pattern, jd_lower)
-            if matches:
-                with open('/tmp/workalign_debug.log', 'a') as f:
-                    f.write(f"Single pattern '{pattern}' matched: {matches}\n")
-                # Convert all matches to integers and take the minimum
-                years_found = [int(m) if isinstance(m, str) else int(m[0]) for m in matches]
-                min_years_required = min(years_found)
-                with open('/tmp/workalign_debug.log', 'a') as f:
-                    f.write(f"  Years found: {years_found}, minimum: {min_years_required}\n")
-                break
-
-    with open('/tmp/workalign_debug.log', 'a') as f:
-        f.write(f"Final min_years_required = {min_years_required}\n\n")
+    # An explicit range ("5-7 years") gives its minimum; otherwise single values
+    # ("5+ years", "minimum 5 years", "at least 5 years", "5 years of experience")
+    # are tried in that order and the smallest of the first kind found is used
+    min_years_required = years_required(jd_text)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Year requirements found: %s; min_years_required = %s",
+                     numeric_facts(jd_text, 'years_required'), min_years_required)
 
     if min_years_required:
         experience_validation['min_required'] = min_years_required
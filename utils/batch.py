@@ -0,0 +1,171 @@
+"""
+Batch analysis: many resumes against many job descriptions
+
+match_resume_jd runs the whole pipeline for a single pair, so screening one JD
+against 500 resumes would parse and extract the JD 500 times. Here every
+document is profiled once (parse, sections, skills, embeddings), then the full
+resume x JD grid is scored with vectorized similarity and ranked.
+"""
+import os
+import numpy as np
+from utils.extractor import load_seniority_levels, extract_seniority, detect_industry
+from utils.matcher import encode_skills, analyze_competencies
+from utils.model_cache import get_nlp, get_embedding_model
+from utils.nlp_context import AnalysisContext
+from utils.ontology_index import get_ontology_index, normalize_rows
+from utils.document_cache import CachedDocument
+
+# Same sections and weights as compute_score in utils/matcher.py
+SECTION_KEYS = ["skills", "experience", "education", "other"]
+SECTION_WEIGHTS = np.array([0.4, 0.3, 0.2, 0.1], dtype=np.float32)
+
+
+def _source_name(source, position, kind):
+    if isinstance(source, str) and os.path.isfile(source):
+        return os.path.basename(source)
+    if getattr(source, 'name', None):
+        return os.path.basename(source.name)
+    return f"{kind}_{position + 1}"
+
+
+def profile_document(source, ontology_index, seniority_levels, name=None):
+    """
+    Run the per-document stages once: parse, sections, skills, seniority, embeddings
+    source: PDF/DOCX path, bytes or file-like object, or raw text
+    Returns: profile dict, or {'name', 'error', 'error_type'} if the document is unusable
+    """
+    try:
+        document = CachedDocument(source)
+        text = document.text
+    except Exception as e:
+        return {'name': name, 'error': f'Failed to parse document: {str(e)}', 'error_type': 'PARSE_ERROR'}
+
+    if len(text.strip()) < 50:
+        return {
+            'name': name,
+            'error': 'Document is too short or empty',
+            'error_type': 'VALIDATION_ERROR'
+        }
+
+    model = get_embedding_model()
+    docs = AnalysisContext(get_nlp())
+    sections = document.sections(docs)
+    skills = document.skills(ontology_index, docs)
+    section_texts = [' '.join(sections.get(k, [])) for k in SECTION_KEYS]
+
+    return {
+        'name': name,
+        'text': text,
+        'sections': sections,
+        'skills': skills,
+        'industries': detect_industry(text),
+        'seniority': extract_seniority(sections['experience'], seniority_levels),
+        'section_embeddings': normalize_rows(model.encode(section_texts)),
+        'skill_embeddings': encode_skills(skills, model)
+    }
+
+
+def profile_documents(sources, ontology_path, seniority_path, kind='document'):
+    """Profile a list of documents, sharing the ontology index and seniority config"""
+    ontology_index = get_ontology_index(ontology_path, get_embedding_model())
+    seniority_levels = load_seniority_levels(seniority_path)
+    return [
+        profile_document(source, ontology_index, seniority_levels, _source_name(source, i, kind))
+        for i, source in enumerate(sources)
+    ]
+
+
+def score_grid(resume_profiles, jd_profiles):
+    """
+    Weighted section similarity for every resume x JD pair (same formula as compute_score)
+    Returns: (n_resumes, n_jds) array of scores on a 0-100 scale; NaN where a profile errored
+    """
+    scores = np.full((len(resume_profiles), len(jd_profiles)), np.nan, dtype=np.float32)
+    resume_ok = [i for i, p in enumerate(resume_profiles) if 'error' not in p]
+    jd_ok = [j for j, p in enumerate(jd_profiles) if 'error' not in p]
+    if not resume_ok or not jd_ok:
+        return scores
+
+    # (n, sections, dim) tensors; one matmul per section
+    resume_embs = np.stack([resume_profiles[i]['section_embeddings'] for i in resume_ok])
+    jd_embs = np.stack([jd_profiles[j]['section_embeddings'] for j in jd_ok])
+    weighted = np.einsum('nsd,msd,s->nm', resume_embs, jd_embs, SECTION_WEIGHTS) * 100
+
+    scores[np.ix_(resume_ok, jd_ok)] = weighted
+    return scores
+
+
+def _pair_details(resume_profile, jd_profile):
+    comp = analyze_competencies(
+        resume_profile['skills'],
+        jd_profile['skills'],
+        get_embedding_model(),
+        resume_embs=resume_profile['skill_embeddings'],
+        jd_embs=jd_profile['skill_embeddings']
+    )
+    return {'matches': comp['matches'], 'gaps': comp['gaps'], 'similar': comp['similar']}
+
+
+def analyze_batch(resumes, jds, ontology_path, seniority_path, top_k=None):
+    """
+    Score every resume against every JD and rank the results both ways
+
+    Args:
+        resumes: list of resume files (paths, bytes or file-like objects) or raw text
+        jds: list of JD files (paths, bytes or file-like objects) or raw JD text
+        top_k: keep only the best k entries per ranking (None = all)
+
+    Returns: dict with per-document summaries, the score grid and rankings
+        by_jd[j] ranks resumes for JD j; by_resume[i] ranks JDs for resume i
+    """
+    resume_profiles = profile_documents(resumes, ontology_path, seniority_path, 'resume')
+    jd_profiles = profile_documents(jds, ontology_path, seniority_path, 'jd')
+    scores = score_grid(resume_profiles, jd_profiles)
+
+    # Skill-level details are only computed for pairs that make it into a ranking
+    details = {}
+
+    def ranked_entry(i, j):
+        if (i, j) not in details:
+            details[(i, j)] = _pair_details(resume_profiles[i], jd_profiles[j])
+        entry = {
+            'resume': i,
+            'jd': j,
+            'resume_name': resume_profiles[i]['name'],
+            'jd_name': jd_profiles[j]['name'],
+            'score': float(scores[i, j])
+        }
+        entry.update(details[(i, j)])
+        return entry
+
+    by_jd = []
+    for j in range(len(jd_profiles)):
+        valid = [i for i in range(len(resume_profiles)) if not np.isnan(scores[i, j])]
+        order = sorted(valid, key=lambda i: scores[i, j], reverse=True)[:top_k]
+        by_jd.append([ranked_entry(i, j) for i in order])
+
+    by_resume = []
+    for i in range(len(resume_profiles)):
+        valid = [j for j in range(len(jd_profiles)) if not np.isnan(scores[i, j])]
+        order = sorted(valid, key=lambda j: scores[i, j], reverse=True)[:top_k]
+        by_resume.append([ranked_entry(i, j) for j in order])
+
+    def summary(profile):
+        if 'error' in profile:
+            return {'name': profile['name'], 'error': profile['error'], 'error_type': profile['error_type']}
+        return {
+            'name': profile['name'],
+            'skills': profile['skills'],
+            'industries': profile['industries'],
+            'seniority': profile['seniority']
+        }
+
+    return {
+        'resumes': [summary(p) for p in resume_profiles],
+        'jds': [summary(p) for p in jd_profiles],
+        'scores': [[None if np.isnan(v) else float(v) for v in row] for row in scores],
+        'rankings': {
+            'by_jd': by_jd,
+            'by_resume': by_resume
+        }
+    }
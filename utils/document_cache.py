@@ -0,0 +1,184 @@
+"""
+Content-addressed cache of parsed documents
+
+The same resume is run against several JDs and the same JD is pasted over and
+over. Parsed artifacts are keyed by a SHA-256 of the raw upload bytes (or the
+pasted text) plus PARSER_VERSION and the page/character caps the text was cut
+at, so a repeat skips parsing and sectioning; extracted skills additionally key
+on EXTRACTOR_VERSION and the ontology index version. Bump those versions whenever their output changes, or the disk tier
+keeps serving artifacts from before the upgrade.
+
+Tiers:
+- memory: bounded LRU (ROLEIQ_DOCUMENT_CACHE_SIZE entries)
+- disk: optional SQLite file (ROLEIQ_DOCUMENT_CACHE_DB), shared across restarts
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from utils.embedding_cache import LRUCache
+from utils.extractor import EXTRACTOR_VERSION, extract_skills
+from utils.parser import (
+    PARSER_VERSION, MAX_PDF_PAGES, MAX_DOCUMENT_CHARS,
+    parse_layout, text_layout, extract_sections, is_document_source, read_bytes
+)
+
+DEFAULT_MEMORY_ENTRIES = int(os.environ.get('ROLEIQ_DOCUMENT_CACHE_SIZE', '256'))
+DEFAULT_DISK_PATH = os.environ.get('ROLEIQ_DOCUMENT_CACHE_DB') or None
+
+
+class SQLiteDocumentStore:
+    """Disk tier: JSON-encoded artifacts keyed by cache key"""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS documents (key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM documents WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, value):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO documents (key, value) VALUES (?, ?)', (key, json.dumps(value))
+            )
+            self._conn.commit()
+
+
+class DocumentCache:
+    """Memory LRU in front of an optional SQLite store; values must be JSON-serializable"""
+
+    def __init__(self, max_entries=DEFAULT_MEMORY_ENTRIES, disk_path=DEFAULT_DISK_PATH):
+        self.memory = LRUCache(max_entries)
+        self.disk = SQLiteDocumentStore(disk_path) if disk_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            with self._stats_lock:
+                self.hits += 1
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.put(key, value)
+                with self._stats_lock:
+                    self.disk_hits += 1
+                return value
+        with self._stats_lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            'memory_entries': len(self.memory)
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_document_cache():
+    """Process-wide DocumentCache configured from the environment"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = DocumentCache()
+    return _default_cache
+
+
+def _raw_document(source):
+    """(bytes, file name) for a document source, read exactly once"""
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            return f.read(), source
+    return read_bytes(source), getattr(source, 'name', None)
+
+
+def content_digest(data):
+    """SHA-256 of raw document bytes, or of the text for pasted JDs"""
+    if isinstance(data, str):
+        return hashlib.sha256(b'text\0' + data.encode('utf-8')).hexdigest()
+    return hashlib.sha256(b'doc\0' + data).hexdigest()
+
+
+class CachedDocument:
+    """
+    Parsed artifacts of one document (text, sections, skills), served from the
+    cache when this exact content was seen before and computed on demand otherwise
+    max_pages/max_chars: parse caps; text cut at other caps is a different cache entry
+    """
+
+    def __init__(self, source, cache=None, max_pages=MAX_PDF_PAGES, max_chars=MAX_DOCUMENT_CHARS):
+        self.cache = cache or get_document_cache()
+        if is_document_source(source):
+            data, name = _raw_document(source)
+        else:
+            data, name = source, None
+        self.digest = content_digest(data)
+        self._version = f"{PARSER_VERSION}:{max_pages}:{max_chars}"
+        self._parsed_key = f"parsed:{self._version}:{self.digest}"
+
+        entry = self.cache.get(self._parsed_key)
+        if entry is not None:
+            self.layout = None
+            self.text = entry['text']
+            self._sections = entry['sections']
+        else:
+            if isinstance(data, str):
+                self.layout = text_layout(data, max_chars=max_chars)
+            else:
+                self.layout = parse_layout(data, filename=name, max_pages=max_pages, max_chars=max_chars)
+            self.text = self.layout.text
+            # Layout sections need no NLP, so they are cached with the text; otherwise sections() adds them
+            self._sections = self.layout.sections if self.layout.has_headers else None
+            self.cache.put(self._parsed_key, {'text': self.text, 'sections': self._sections})
+
+    @property
+    def cached(self):
+        """True if parsing was skipped"""
+        return self.layout is None
+
+    def sections(self, nlp=None):
+        if self._sections is None:
+            self._sections = extract_sections(self.text, nlp, layout=self.layout)
+            self.cache.put(self._parsed_key, {'text': self.text, 'sections': self._sections})
+        return {name: list(items) for name, items in self._sections.items()}
+
+    def skills(self, ontology_index, nlp=None):
+        """Extracted skills; cached per extractor and ontology index version (which includes the model)"""
+        ontology_version = getattr(ontology_index, 'key', None) or 'none'
+        key = f"skills:{self._version}:{EXTRACTOR_VERSION}:{ontology_version}:{self.digest}"
+        skills = self.cache.get(key)
+        if skills is None:
+            skills = extract_skills(self.text, ontology_index, nlp)
+            self.cache.put(key, skills)
+        return list(skills)
@@ -0,0 +1,196 @@
+"""
+Content-addressed embedding cache
+
+The same skill phrases, bullets and sentences are encoded many times per
+request and across requests. CachedEncoder wraps a SentenceTransformer and
+keys every string by a hash of its whitespace-normalized text plus the model
+id, so a phrase like "accounts payable" is encoded once per model.
+
+Tiers:
+- memory: bounded LRU (ROLEIQ_EMBEDDING_CACHE_SIZE entries)
+- disk: optional SQLite file (ROLEIQ_EMBEDDING_CACHE_DB), shared across restarts
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+
+DEFAULT_MEMORY_ENTRIES = int(os.environ.get('ROLEIQ_EMBEDDING_CACHE_SIZE', '20000'))
+DEFAULT_DISK_PATH = os.environ.get('ROLEIQ_EMBEDDING_CACHE_DB') or None
+
+# encode() kwargs that do not change the returned vectors
+_PASSTHROUGH_KWARGS = {'batch_size', 'show_progress_bar', 'convert_to_numpy', 'device'}
+
+
+class LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used entry"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteEmbeddingStore:
+    """Disk tier: float32 vectors stored as blobs keyed by content hash"""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)'
+        )
+        self._conn.commit()
+
+    def get_many(self, keys):
+        """Return {key: vector} for the keys present on disk"""
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT key, vector FROM embeddings WHERE key IN ({placeholders})', chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items):
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)',
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+            )
+            self._conn.commit()
+
+
+def normalize_text(text):
+    """Whitespace-normalized form used both as the cache key and as the encoded text"""
+    return ' '.join(str(text).split())
+
+
+def embedding_key(text, model_id):
+    return hashlib.sha256(f"{model_id}\0{text}".encode('utf-8')).hexdigest()
+
+
+class CachedEncoder:
+    """
+    Drop-in wrapper around SentenceTransformer.encode with memory and disk tiers
+    Other attributes are forwarded to the wrapped model.
+    """
+
+    def __init__(self, model, model_id, max_entries=DEFAULT_MEMORY_ENTRIES, disk_path=DEFAULT_DISK_PATH):
+        self.uncached = model
+        self.model_id = model_id
+        self.memory = LRUCache(max_entries)
+        self.disk = SQLiteEmbeddingStore(disk_path) if disk_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name == 'uncached':
+            raise AttributeError(name)  # Not initialised yet (e.g. during unpickling)
+        return getattr(self.uncached, name)
+
+    def encode(self, sentences, batch_size=32, convert_to_tensor=False, **kwargs):
+        # Output-changing options (normalize_embeddings, precision, ...) bypass the cache
+        if set(kwargs) - _PASSTHROUGH_KWARGS:
+            return self.uncached.encode(sentences, batch_size=batch_size,
+                                        convert_to_tensor=convert_to_tensor, **kwargs)
+
+        single = isinstance(sentences, str)
+        texts = [normalize_text(t) for t in ([sentences] if single else sentences)]
+        keys = [embedding_key(t, self.model_id) for t in texts]
+
+        vectors = {}
+        for key in keys:
+            if key not in vectors:
+                cached = self.memory.get(key)
+                if cached is not None:
+                    vectors[key] = cached
+        memory_hits = sum(1 for key in keys if key in vectors)
+
+        # Unique misses, in first-seen order
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+
+        disk_hits = 0
+        if missing and self.disk is not None:
+            for key, vector in self.disk.get_many(missing).items():
+                vectors[key] = vector
+                self.memory.put(key, vector)
+                del missing[key]
+                disk_hits += 1
+
+        if missing:
+            encoded = np.asarray(
+                self.uncached.encode(list(missing.values()), batch_size=batch_size, **kwargs),
+                dtype=np.float32
+            )
+            new_items = list(zip(missing.keys(), encoded))
+            for key, vector in new_items:
+                vectors[key] = vector
+                self.memory.put(key, vector)
+            if self.disk is not None:
+                self.disk.put_many(new_items)
+
+        with self._stats_lock:
+            self.hits += memory_hits
+            self.disk_hits += disk_hits
+            self.misses += len(missing)
+
+        if keys:
+            result = np.stack([vectors[key] for key in keys])
+        else:
+            result = np.zeros((0, self.uncached.get_sentence_embedding_dimension() or 0), dtype=np.float32)
+
+        if convert_to_tensor:
+            import torch
+            result = torch.from_numpy(result)
+        return result[0] if single else result
+
+    def stats(self):
+        """Hit/miss counters for monitoring (hits are memory-tier hits)"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            'memory_entries': len(self.memory)
+        }
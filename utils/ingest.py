@@ -0,0 +1,428 @@
+"""
+Bulk document ingestion
+
+Walks a directory (recursively) or a .zip archive of PDF/DOCX files, parses
+them in a process pool and streams one record per file to JSONL or Parquet.
+Parsing is the structural pass from utils/parser.parse_layout, so workers
+never load spaCy or the sentence transformer.
+
+Failures stay per file: a corrupt document, a parse that runs past the
+per-file timeout, or a worker that crashes outright is recorded with
+status 'error' / 'timeout' and the rest of the batch carries on. The
+timeout is enforced twice: SIGALRM in the worker stops a slow parse between
+pages, and a wall-clock deadline in the parent kills the pool when a parse
+is stuck inside native code (e.g. MuPDF), where the alarm never fires.
+
+Job descriptions exported from the ATS as CSV are streamed in chunks instead:
+each row is normalized with clean_text, repeated postings are dropped by
+content hash, and skills are extracted a batch of rows at a time.
+
+Usage:
+    python -m utils.ingest resumes/ resumes.jsonl
+    python -m utils.ingest backlog.zip resumes.parquet --workers 16 --timeout 30
+    python -m utils.ingest jds.csv jds.jsonl --ontology data/ontologies/esco_skills_en.csv
+"""
+import hashlib
+import json
+import os
+import signal
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, TimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.parser import PARSER_VERSION, MAX_PDF_PAGES, MAX_DOCUMENT_CHARS, parse_layout, clean_text
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+DEFAULT_TIMEOUT = 60  # seconds per file
+HARD_TIMEOUT_GRACE = 5  # seconds past the timeout before the parent kills a stuck worker
+POLL_SECONDS = 1.0  # how often the parent checks in-flight files against their deadline
+PARQUET_BATCH_ROWS = 500
+CSV_CHUNK_ROWS = 1000
+SKILL_BATCH_ROWS = 64
+
+# Output columns; 'json' columns are stored as JSON strings in Parquet
+DOCUMENT_COLUMNS = [
+    ('name', 'string'), ('status', 'string'), ('error', 'string'), ('parser_version', 'int64'),
+    ('sha256', 'string'), ('bytes', 'int64'), ('text', 'string'), ('chars', 'int64'),
+    ('sections', 'json'), ('section_spans', 'json'), ('has_headers', 'bool'), ('parse_seconds', 'float64')
+]
+JD_COLUMNS = [
+    ('row', 'int64'), ('sha256', 'string'), ('duplicate_of', 'int64'), ('text', 'string'),
+    ('chars', 'int64'), ('skills', 'json')
+]
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+def find_documents(source):
+    """
+    Yield ingestion tasks for every PDF/DOCX under a directory or inside a .zip
+    Each task is {'name', 'path', 'member'}; member is set for archive entries.
+    """
+    if zipfile.is_zipfile(source) and not source.lower().endswith('.docx'):
+        with zipfile.ZipFile(source) as archive:
+            for member in sorted(archive.namelist()):
+                if member.lower().endswith(SUPPORTED_EXTENSIONS) and not member.endswith('/'):
+                    yield {'name': member, 'path': source, 'member': member}
+    elif os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for file_name in sorted(files):
+                if file_name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    path = os.path.join(root, file_name)
+                    yield {'name': os.path.relpath(path, source), 'path': path, 'member': None}
+    elif source.lower().endswith(SUPPORTED_EXTENSIONS):
+        yield {'name': os.path.basename(source), 'path': source, 'member': None}
+    else:
+        raise ValueError(f"Not a directory, .zip archive or PDF/DOCX file: {source}")
+
+
+def _read_task(task):
+    if task['member'] is not None:
+        with zipfile.ZipFile(task['path']) as archive:
+            return archive.read(task['member'])
+    with open(task['path'], 'rb') as f:
+        return f.read()
+
+
+def _raise_timeout(signum, frame):
+    raise ParseTimeout()
+
+
+def ingest_document(task, timeout=DEFAULT_TIMEOUT, max_pages=MAX_PDF_PAGES, max_chars=MAX_DOCUMENT_CHARS):
+    """Parse one document into an ingestion record; never raises"""
+    record = {'name': task['name'], 'status': 'ok', 'error': None, 'parser_version': PARSER_VERSION}
+    start = time.perf_counter()
+    # SIGALRM interrupts the parse between pages; only available on POSIX
+    use_alarm = timeout and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        data = _read_task(task)
+        record['sha256'] = hashlib.sha256(data).hexdigest()
+        record['bytes'] = len(data)
+        layout = parse_layout(data, filename=task['name'], max_pages=max_pages, max_chars=max_chars)
+        record.update({
+            'text': layout.text,
+            'chars': len(layout.text),
+            'sections': layout.sections,
+            'section_spans': layout.section_spans,
+            'has_headers': layout.has_headers
+        })
+    except ParseTimeout:
+        record.update({'status': 'timeout', 'error': f'Parsing exceeded {timeout}s'})
+    except Exception as e:
+        record.update({'status': 'error', 'error': f'{type(e).__name__}: {e}'})
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    record['parse_seconds'] = round(time.perf_counter() - start, 4)
+    return record
+
+
+class JSONLWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """Writes records in row groups of the given columns (requires pyarrow)"""
+
+    def __init__(self, path, columns=DOCUMENT_COLUMNS):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow")
+        self.path = path
+        self.columns = columns
+        self._writer = None
+        self._rows = []
+
+    def write(self, record):
+        row = {}
+        for column, kind in self.columns:
+            value = record.get(column)
+            if kind == 'json' and value is not None:
+                value = json.dumps(value, ensure_ascii=False)
+            row[column] = value
+        self._rows.append(row)
+        if len(self._rows) >= PARQUET_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if not self._rows:
+            return
+        types = {'string': pa.string(), 'json': pa.string(), 'int64': pa.int64(),
+                 'float64': pa.float64(), 'bool': pa.bool_()}
+        schema = pa.schema([(column, types[kind]) for column, kind in self.columns])
+        table = pa.Table.from_pylist(self._rows, schema=schema)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, schema)
+        self._writer.write_table(table)
+        self._rows = []
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_writer(path, columns=DOCUMENT_COLUMNS):
+    return ParquetWriter(path, columns) if path.lower().endswith('.parquet') else JSONLWriter(path)
+
+
+def _hard_timeout(timeout):
+    """Wall-clock seconds the parent allows one file, or None without a timeout"""
+    return timeout + HARD_TIMEOUT_GRACE if timeout else None
+
+
+def _timeout_record(task, timeout):
+    return {'name': task['name'], 'status': 'timeout',
+            'error': f'Parsing exceeded {timeout}s (worker killed)', 'parser_version': PARSER_VERSION}
+
+
+def _kill_pool(executor):
+    """Kill the pool's worker processes; a parse stuck in native code never returns on its own"""
+    for process in list((getattr(executor, '_processes', None) or {}).values()):
+        process.kill()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _ingest_isolated(task, timeout, max_pages, max_chars):
+    """Re-run one file in its own process, so a crash or hang can only take down that file"""
+    executor = ProcessPoolExecutor(max_workers=1)
+    try:
+        future = executor.submit(ingest_document, task, timeout, max_pages, max_chars)
+        return future.result(timeout=_hard_timeout(timeout))
+    except BrokenProcessPool:
+        return {'name': task['name'], 'status': 'error', 'error': 'Worker process crashed while parsing',
+                'parser_version': PARSER_VERSION}
+    except TimeoutError:
+        _kill_pool(executor)
+        return _timeout_record(task, timeout)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def ingest(source, output_path, workers=None, timeout=DEFAULT_TIMEOUT,
+           max_pages=MAX_PDF_PAGES, max_chars=MAX_DOCUMENT_CHARS, progress=None):
+    """
+    Parse every document under source in parallel and stream records to output_path
+
+    At most one file per worker is in flight, so memory stays flat however
+    large the backlog and each file's deadline runs from when a worker picked
+    it up. If a worker process dies (e.g. a native crash on a corrupt PDF) the
+    pool is restarted, and every file that was in flight is retried on its own
+    at the end so only the culprit is recorded as an error. If a file is still
+    running timeout + HARD_TIMEOUT_GRACE seconds after it started, it is
+    recorded as 'timeout', the pool is killed and restarted, and the other
+    files that were in flight are submitted again.
+
+    Returns: {'ok', 'error', 'timeout', 'total', 'seconds'} counts
+    """
+    workers = workers or os.cpu_count() or 1
+    hard_timeout = _hard_timeout(timeout)
+    counts = {'ok': 0, 'error': 0, 'timeout': 0}
+    start = time.perf_counter()
+    tasks = iter(find_documents(source))
+    writer = open_writer(output_path)
+
+    def record_result(record):
+        counts[record['status']] += 1
+        writer.write(record)
+        if progress:
+            progress(record)
+
+    try:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        pending = {}
+        started = {}  # future -> monotonic time it was first seen running
+        retry = deque()  # in flight when the pool was killed for another file's hang
+        suspects = []
+        exhausted = False
+        while pending or retry or not exhausted:
+            while len(pending) < workers and (retry or not exhausted):
+                task = retry.popleft() if retry else next(tasks, None)
+                if task is None:
+                    exhausted = True
+                    break
+                pending[executor.submit(ingest_document, task, timeout, max_pages, max_chars)] = task
+
+            if not pending:
+                break
+            done, _ = wait(pending, timeout=POLL_SECONDS if hard_timeout else None, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                task = pending.pop(future)
+                started.pop(future, None)
+                try:
+                    record_result(future.result())
+                except BrokenProcessPool:
+                    broken = True
+                    suspects.append(task)
+
+            hung = []
+            if hard_timeout and not broken:
+                now = time.monotonic()
+                for future in pending:
+                    if future.running():
+                        started.setdefault(future, now)
+                    if future in started and now - started[future] > hard_timeout:
+                        hung.append(future)
+                for future in hung:
+                    started.pop(future)
+                    record_result(_timeout_record(pending.pop(future), timeout))
+
+            if broken or hung:
+                if broken:
+                    # Every in-flight future fails with the pool; retry them later, one by one
+                    suspects.extend(pending.values())
+                else:
+                    # The stuck files are recorded; the rest were healthy, so submit them again
+                    retry.extend(pending.values())
+                pending = {}
+                started.clear()
+                _kill_pool(executor)
+                executor = ProcessPoolExecutor(max_workers=workers)
+        executor.shutdown()
+
+        for task in suspects:
+            record_result(_ingest_isolated(task, timeout, max_pages, max_chars))
+    finally:
+        writer.close()
+
+    counts['total'] = sum(counts.values())
+    counts['seconds'] = round(time.perf_counter() - start, 2)
+    return counts
+
+
+def iter_csv_jds(path, chunksize=CSV_CHUNK_ROWS, columns=None, header=False):
+    """
+    Stream job descriptions from a CSV export, chunksize rows at a time
+
+    Every non-empty cell of a row (or only the given columns) is joined and
+    normalized with clean_text. Yields {'row', 'sha256', 'text', 'duplicate_of'};
+    duplicate_of is the row of the first identical posting, and such rows carry
+    no text. Only the digests of postings already seen are kept in memory.
+    """
+    import pandas as pd
+
+    first_seen = {}
+    reader = pd.read_csv(
+        path, header=0 if header else None, usecols=columns, chunksize=chunksize,
+        dtype=str, keep_default_na=False, encoding='utf-8-sig'
+    )
+    row = 0
+    for chunk in reader:
+        for cells in chunk.itertuples(index=False, name=None):
+            text = clean_text(' '.join(cell for cell in cells if cell.strip()))
+            if text:
+                digest = hashlib.sha256(text.encode('utf-8')).digest()
+                if digest in first_seen:
+                    yield {'row': row, 'sha256': digest.hex(), 'text': None, 'duplicate_of': first_seen[digest]}
+                else:
+                    first_seen[digest] = row
+                    yield {'row': row, 'sha256': digest.hex(), 'text': text, 'duplicate_of': None}
+            row += 1
+
+
+def ingest_jd_csv(path, output_path, ontology=None, chunksize=CSV_CHUNK_ROWS, batch_size=SKILL_BATCH_ROWS,
+                  columns=None, header=False, progress=None):
+    """
+    Extract skills from every unique JD in a CSV export and stream records to output_path
+
+    Skills are extracted batch_size postings at a time (one spaCy pipe and one
+    embedding call per batch); duplicates are written with duplicate_of set.
+    Memory is bounded by the chunk and batch sizes, whatever the export size.
+
+    Returns: {'unique', 'duplicates', 'total', 'seconds'} counts
+    """
+    from utils.extractor import extract_skills_batch
+    from utils.model_cache import get_embedding_model
+    from utils.ontology_index import get_ontology_index
+
+    ontology_index = get_ontology_index(ontology, get_embedding_model()) if ontology else None
+    counts = {'unique': 0, 'duplicates': 0}
+    start = time.perf_counter()
+    writer = open_writer(output_path, JD_COLUMNS)
+    batch = []
+
+    def write_record(record):
+        writer.write(record)
+        if progress:
+            progress(record)
+
+    def flush():
+        skills = extract_skills_batch([record['text'] for record in batch], ontology_index, batch_size=batch_size)
+        for record, record_skills in zip(batch, skills):
+            record.update({'chars': len(record['text']), 'skills': sorted(record_skills)})
+            write_record(record)
+        batch.clear()
+
+    try:
+        for record in iter_csv_jds(path, chunksize, columns, header):
+            if record['duplicate_of'] is not None:
+                counts['duplicates'] += 1
+                write_record(record)
+                continue
+            counts['unique'] += 1
+            batch.append(record)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        writer.close()
+
+    counts['total'] = counts['unique'] + counts['duplicates']
+    counts['seconds'] = round(time.perf_counter() - start, 2)
+    return counts
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Parse a directory or .zip of resumes, or a CSV of JDs, into JSONL/Parquet')
+    parser.add_argument('source', help='Directory, .zip archive, single PDF/DOCX, or CSV export of JDs')
+    parser.add_argument('output', help='Output path (.jsonl or .parquet)')
+    parser.add_argument('--workers', type=int, default=None, help='Parser processes (default: all cores)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='Seconds allowed per file')
+    parser.add_argument('--max-pages', type=int, default=MAX_PDF_PAGES)
+    parser.add_argument('--max-chars', type=int, default=MAX_DOCUMENT_CHARS)
+    parser.add_argument('--ontology', help='CSV only: ontology for skill matching')
+    parser.add_argument('--header', action='store_true', help='CSV only: the first row holds column names')
+    parser.add_argument('--columns', help='CSV only: comma-separated columns holding JD text (default: all)')
+    parser.add_argument('--chunk-rows', type=int, default=CSV_CHUNK_ROWS, help='CSV only: rows read at a time')
+    parser.add_argument('--batch-rows', type=int, default=SKILL_BATCH_ROWS, help='CSV only: JDs per skill batch')
+    args = parser.parse_args()
+
+    if args.source.lower().endswith('.csv'):
+        columns = None
+        if args.columns:
+            columns = [c.strip() for c in args.columns.split(',')]
+            if not args.header:
+                columns = [int(c) for c in columns]
+        summary = ingest_jd_csv(args.source, args.output, args.ontology, args.chunk_rows, args.batch_rows,
+                                columns, args.header)
+    else:
+        def report(record):
+            if record['status'] != 'ok':
+                print(f"{record['status'].upper()}: {record['name']}: {record['error']}", file=sys.stderr)
+
+        summary = ingest(args.source, args.output, args.workers, args.timeout,
+                         args.max_pages, args.max_chars, progress=report)
+    print(json.dumps(summary))
@@ -0,0 +1,143 @@
+"""
+Word-bounded dictionary matching
+
+Industry keywords, certification names/aliases and job title variations are
+compiled into one token trie. A text is scanned once: at each token the trie
+is walked as far as the following tokens allow, so the cost grows with the
+text, not with the number of dictionary entries, and "ap" no longer matches
+inside "apply".
+
+Usage:
+    hits = dictionary_hits(text)  # all hits, memoized on a TextDocument
+    industry_hits = [h for h in hits if h.kind == 'industry']
+"""
+import threading
+from utils.parser import as_text_document, tokenize
+
+_END = object()  # Trie key holding the payloads of entries that end at a node
+
+
+class KeywordHit:
+    """One dictionary entry found in a text; start/end are offsets into the original text"""
+
+    __slots__ = ('phrase', 'payload', 'start', 'end')
+
+    def __init__(self, phrase, payload, start, end):
+        self.phrase = phrase
+        self.payload = payload
+        self.start = start
+        self.end = end
+
+    @property
+    def kind(self):
+        return self.payload[0]
+
+    def __repr__(self):
+        return f"KeywordHit({self.phrase!r}, {self.payload!r}, {self.start}, {self.end})"
+
+
+class KeywordMatcher:
+    """
+    Token trie over (phrase, payload) entries
+
+    Phrases are tokenized like TextDocument.tokens, so matches always start
+    and end on word boundaries. A phrase may carry several payloads (the same
+    keyword in two industries); each is reported as its own hit.
+    """
+
+    def __init__(self, entries=()):
+        self._root = {}
+        self.size = 0
+        for phrase, payload in entries:
+            self.add(phrase, payload)
+
+    def add(self, phrase, payload):
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(_END, []).append((' '.join(tokens), payload))
+        self.size += 1
+
+    def scan(self, text):
+        """All hits in text (a string or TextDocument), overlapping ones included, in text order"""
+        tokens = as_text_document(text).tokens
+        hits = []
+        for i, first in enumerate(tokens):
+            node = self._root.get(first.text)
+            j = i
+            while node is not None:
+                for phrase, payload in node.get(_END, ()):
+                    hits.append(KeywordHit(phrase, payload, first.start, tokens[j].end))
+                j += 1
+                node = node.get(tokens[j].text) if j < len(tokens) else None
+        return hits
+
+
+class DictionaryMatcher(KeywordMatcher):
+    """
+    The shared matcher over INDUSTRY_KEYWORDS, certifications.json and job_titles.json
+
+    Payloads:
+        ('industry', industry)
+        ('certification', industry, tier, cert)    tier is 'critical' or 'valuable'
+        ('title', canonical, order)                order ranks variations as listed
+        ('title_level', canonical, level, rank)    rank follows level_indicators order
+    """
+
+    def __init__(self, industry_keywords, certifications, job_titles, versions=None):
+        super().__init__()
+        self.versions = versions  # Ontology file versions this matcher was built from
+        self.certifications = certifications
+        self.job_titles = job_titles
+        for industry, keywords in industry_keywords.items():
+            for keyword in keywords:
+                self.add(keyword, ('industry', industry))
+        for industry, tiers in certifications.items():
+            for tier in ('critical', 'valuable'):
+                for cert in tiers.get(tier, []):
+                    payload = ('certification', industry, tier, cert)
+                    for name in [cert['name'], cert['full_name']] + cert.get('aliases', []):
+                        self.add(name, payload)
+        order = 0
+        for canonical, data in job_titles.items():
+            for variation in data.get('variations', []):
+                self.add(variation, ('title', canonical, order))
+                order += 1
+            for rank, (level, keywords) in enumerate(data.get('level_indicators', {}).items()):
+                for keyword in keywords:
+                    self.add(keyword, ('title_level', canonical, level, rank))
+
+
+_dictionary_matcher = None
+_dictionary_lock = threading.Lock()
+
+
+def get_dictionary_matcher():
+    """Process-wide DictionaryMatcher, rebuilt when an ontology file changes"""
+    global _dictionary_matcher
+    from utils.ontology_utils import ontology_versions
+    versions = ontology_versions()
+    if _dictionary_matcher is None or _dictionary_matcher.versions != versions:
+        with _dictionary_lock:
+            if _dictionary_matcher is None or _dictionary_matcher.versions != versions:
+                from utils.extractor import INDUSTRY_KEYWORDS
+                from utils.ontology_utils import load_certifications, load_job_titles
+                _dictionary_matcher = DictionaryMatcher(
+                    INDUSTRY_KEYWORDS, load_certifications(), load_job_titles(), versions
+                )
+    return _dictionary_matcher
+
+
+def dictionary_hits(text, kind=None):
+    """
+    Dictionary hits in text, optionally only those of one kind
+    The scan runs once per TextDocument; industry, certification and title
+    detection on the same document share it.
+    """
+    hits = as_text_document(text).derived('dictionary_hits', get_dictionary_matcher().scan)
+    if kind is None:
+        return hits
+    return [hit for hit in hits if hit.kind == kind]
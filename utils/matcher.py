@@ -1,8 +1,13 @@
-from sentence_transformers import util
-from utils.model_cache import load_sentence_transformer
-from utils.extractor import load_seniority_levels, load_ontology, extract_skills, extract_seniority, detect_industry, nlp
-from utils.parser import parse_document, clean_text, extract_sections
+from utils.model_cache import get_nlp, get_embedding_model
+from utils.extractor import load_seniority_levels, extract_seniority, detect_industry
+from utils.ontology_index import get_ontology_index, normalize_rows, cos_sim
+from utils.document_cache import CachedDocument
+from utils.parser import TextDocument, TextSpan, as_text_document
+from utils.mention_index import MentionIndex
+from utils.timeline import extract_timeline
 from utils.llm_validator import validate_gaps_with_llm
+from utils.nlp_context import AnalysisContext
+from utils.timing import stage
 from utils.ontology_utils import (
     normalize_job_title,
     detect_certifications,
@@ -13,12 +18,11 @@ from utils.ontology_utils import (
 from utils.analyzers import (
     extract_achievements,
     analyze_action_verbs,
-    cluster_skills,
+    group_similar_skills,
     calculate_ats_keyword_density,
     detect_leadership_language,
     classify_task_vs_outcome,
     score_resume_sections,
-    detect_skill_redundancies,
     classify_hard_vs_soft_skills,
     extract_skill_context,
     analyze_experience_progression,
@@ -37,14 +41,37 @@ from utils.analyzers import (
 )
 import os
 import re
-
-model = load_sentence_transformer()
+from bisect import bisect_right
+import numpy as np
+
+def _env_budget(name, default):
+    value = int(os.environ.get(name, str(default)))
+    return value if value >= 0 else None
+
+# Caps for the per-item analyzers; a negative value (env or per call) means no cap.
+# Set them per deployment with ROLEIQ_MAX_*, or per call with match_resume_jd(budgets=...)
+ANALYSIS_BUDGETS = {
+    'max_gaps': _env_budget('ROLEIQ_MAX_GAP_CONTEXTS', 10),  # extract_skill_context
+    'max_evidence_skills': _env_budget('ROLEIQ_MAX_EVIDENCE_SKILLS', 15),  # assess_skill_evidence
+    'max_placement_skills': _env_budget('ROLEIQ_MAX_PLACEMENT_SKILLS', 20),  # analyze_keyword_placement
+    'max_bullets': _env_budget('ROLEIQ_MAX_BULLETS', 25)  # score_resume_bullets
+}
+
+def analysis_budgets(overrides=None):
+    """ANALYSIS_BUDGETS with the non-None overrides applied (negative: no cap); unknown names raise ValueError"""
+    budgets = dict(ANALYSIS_BUDGETS)
+    for name, value in (overrides or {}).items():
+        if name not in budgets:
+            raise ValueError(f"Unknown analysis budget: {name}")
+        if value is not None:
+            budgets[name] = value if value >= 0 else None
+    return budgets
 
 def get_embeddings(texts):
-    return model.encode(texts, convert_to_tensor=True)
+    return get_embedding_model().encode(texts)
 
 def compute_score(resume_embs, jd_embs, weights=[0.4, 0.3, 0.2, 0.1]):
-    scores = [util.cos_sim(resume_embs[i], jd_embs[i])[0][0].item() for i in range(len(weights))]
+    scores = [cos_sim(resume_embs[i], jd_embs[i])[0][0].item() for i in range(len(weights))]
     total_score = sum(s * w for s, w in zip(scores, weights)) * 100
     return total_score
 
@@ -55,7 +82,27 @@ def analyze_seniority(resume_seniority, jd_seniority):
     points.append(f"Overall seniority: {'Strong fit' if resume_seniority['level'] >= jd_seniority['level'] else 'Partial fit - action: Build with leadership examples'} - simple explanation: Resume and JD {'align in career stage' if resume_seniority['level'] >= jd_seniority['level'] else 'differ in responsibility; JD more senior'}.")
     return points
 
-def analyze_competencies(resume_skills, jd_skills, model):
+def encode_skills(skills, model):
+    """Encode a skill list in one batch; returns L2-normalized rows aligned with skills"""
+    skills = list(skills)
+    if not skills:
+        return np.zeros((0, 0), dtype=np.float32)
+    return normalize_rows(model.encode(skills))
+
+def analyze_competencies(resume_skills, jd_skills, model, resume_embs=None, jd_embs=None):
+    """
+    Compare resume and JD skill sets: exact, partial, ontology and semantic matches
+
+    resume_embs/jd_embs are optional normalized embeddings aligned with the skill lists.
+    Each list is encoded at most once; the semantic pass is a single matrix product.
+    """
+    resume_skills = list(resume_skills)
+    jd_skills = list(jd_skills)
+    if resume_embs is None:
+        resume_embs = encode_skills(resume_skills, model)
+    if jd_embs is None:
+        jd_embs = encode_skills(jd_skills, model)
+
     # First pass: exact matches
     matches = set(resume_skills) & set(jd_skills)
 
@@ -88,55 +135,104 @@ def analyze_competencies(resume_skills, jd_skills, model):
             gaps.remove(ontology_match)
 
     # Third pass: semantic similarity for remaining gaps
+    # One (remaining resume skills x gaps) similarity matrix instead of two encodes per pair
     remaining_resume = remaining_resume - partial_matches
-    similar = [s for s in remaining_resume if any(util.cos_sim(model.encode(s), model.encode(g))[0][0].item() > 0.55 for g in gaps)]  # Lowered from 0.7 to 0.55
+    resume_rows = list(remaining_resume)
+    gap_cols = list(gaps)
+    resume_pos = {skill: i for i, skill in enumerate(resume_skills)}
+    jd_pos = {skill: i for i, skill in enumerate(jd_skills)}
+    if resume_rows and gap_cols:
+        similarity_matrix = (
+            resume_embs[[resume_pos[s] for s in resume_rows]] @ jd_embs[[jd_pos[g] for g in gap_cols]].T
+        )
+    else:
+        similarity_matrix = np.zeros((len(resume_rows), len(gap_cols)), dtype=np.float32)
+    similar = [s for s, row in zip(resume_rows, similarity_matrix) if (row > 0.55).any()]  # Lowered from 0.7 to 0.55
+
     points = []
     points.append(f"Direct matches: {len(matches)} skills overlap (e.g., {', '.join(list(matches)[:2]) if matches else 'none'}) - {'Similar: Strong core alignment' if matches else 'Different: No overlap - action: Add JD skills'}.")
     points.append(f"Gaps: {len(gaps)} skills missing (e.g., {', '.join(list(gaps)[:2]) if gaps else 'none'}) - {'Different: Add to resume' if gaps else 'Similar: No gaps'} - action: Include examples for gaps.")
     points.append(f"Similar skills: {len(similar)} close to gaps (e.g., {', '.join(similar[:2]) if similar else 'none'}) - {'Similar: Partial fit' if similar else 'Different: No close matches'} - action: Rephrase to align.")
-    return {'points': points, 'matches': list(matches), 'gaps': list(gaps), 'similar': similar, 'analysis': '\n'.join(points)}
+    return {
+        'points': points,
+        'matches': list(matches),
+        'gaps': list(gaps),
+        'similar': similar,
+        'analysis': '\n'.join(points),
+        # Reusable by downstream analyzers: rows/cols name the matrix axes
+        'similarity': {
+            'resume_skills': resume_rows,
+            'gaps': gap_cols,
+            'matrix': similarity_matrix
+        },
+        'skill_embeddings': {
+            'resume': resume_embs,
+            'jd': jd_embs
+        }
+    }
+
+_BULLET_PREFIX = re.compile(r'[•\-\*\+►▪→●○]\s*')
+_NUMBER_PREFIX = re.compile(r'\d+\.\s*')  # Numbered lists
 
-def extract_bullets(text):
+def extract_bullet_spans(document):
     """
-    Extract bullet points and sentences from text for sentence-level comparison.
-    Returns a list of meaningful sentences/bullets.
+    Bullet points (or, failing that, sentences) of a TextDocument as TextSpans
+    whose text is lowercased and whose offsets point into the document.
     """
     bullets = []
 
     # Split by common bullet indicators
-    lines = text.split('\n')
-    for line in lines:
-        line = line.strip()
+    for line in document.lines:
         # Remove bullet characters
-        line = re.sub(r'^[•\-\*\+►▪→●○]\s*', '', line)
-        line = re.sub(r'^\d+\.\s*', '', line)  # Remove numbered lists
+        offset = 0
+        for prefix in (_BULLET_PREFIX, _NUMBER_PREFIX):
+            match = prefix.match(line.text, offset)
+            if match:
+                offset = match.end()
+        text = line.text[offset:]
 
         # Skip very short lines (likely headers or noise)
-        if len(line.split()) < 4:
+        if len(text.split()) < 4:
             continue
 
         # Skip lines that look like section headers
-        if line.isupper() or line.endswith(':'):
+        if text.isupper() or text.endswith(':'):
             continue
 
-        bullets.append(line.lower())
+        bullets.append(TextSpan(text.lower(), line.start + offset, line.end))
 
     # If we didn't extract many bullets, fall back to sentence splitting
     if len(bullets) < 3:
-        doc = nlp(text)
-        bullets = [sent.text.lower().strip() for sent in doc.sents if len(sent.text.split()) >= 4]
+        bullets = [
+            TextSpan(sent.text.lower(), sent.start, sent.end)
+            for sent in document.sentences if len(sent.text.split()) >= 4
+        ]
 
     return bullets
 
-def sentence_level_matching(resume_text, jd_text, identified_gaps, model):
+def extract_bullets(text, nlp=None):
+    """
+    Extract bullet points and sentences from text for sentence-level comparison.
+    Returns a list of meaningful sentences/bullets.
+    """
+    if nlp is None and not isinstance(text, TextDocument):
+        nlp = get_nlp()
+    return [bullet.text for bullet in extract_bullet_spans(as_text_document(text, nlp))]
+
+def sentence_level_matching(resume_text, jd_text, identified_gaps, model, nlp=None, jd_mentions=None):
     """
     Perform sentence-level comparison between resume and JD as a fallback.
     This helps catch skills that were missed by keyword extraction.
+    resume_text/jd_text may be strings or TextDocuments (pass the request's views to share their line tables)
+    jd_mentions: MentionIndex over the JD (built with nlp), built here when not passed
 
     Returns a list of gaps that appear to be false positives (actually present in resume).
     """
-    resume_bullets = extract_bullets(resume_text)
-    jd_bullets = extract_bullets(jd_text)
+    if jd_mentions is None:
+        jd_mentions = MentionIndex(as_text_document(jd_text, nlp if nlp is not None else get_nlp()), identified_gaps)
+    resume_bullets = extract_bullets(resume_text, nlp)
+    jd_bullet_spans = extract_bullet_spans(jd_mentions.document)
+    jd_bullets = [bullet.text for bullet in jd_bullet_spans]
 
     if not resume_bullets or not jd_bullets:
         return []  # Can't perform comparison
@@ -148,22 +244,24 @@ def sentence_level_matching(resume_text, jd_text, identified_gaps, model):
     # For each identified gap, check if it appears in any JD bullet
     # and if that JD bullet has high similarity to any resume bullet
     false_positive_gaps = []
+    bullet_starts = [bullet.start for bullet in jd_bullet_spans]
 
     for gap in identified_gaps:
         gap_lower = gap.lower()
 
-        # Find JD bullets that mention this gap
+        # Find JD bullets that mention this gap, from its indexed mentions
         relevant_jd_bullets = []
-        for i, jd_bullet in enumerate(jd_bullets):
-            if gap_lower in jd_bullet:
-                relevant_jd_bullets.append((i, jd_bullet))
+        for start, end in jd_mentions.mentions(gap):
+            i = bisect_right(bullet_starts, start) - 1
+            if i >= 0 and end <= jd_bullet_spans[i].end and (not relevant_jd_bullets or relevant_jd_bullets[-1][0] != i):
+                relevant_jd_bullets.append((i, jd_bullets[i]))
 
         # For each relevant JD bullet, check if there's a similar resume bullet
         for jd_idx, jd_bullet in relevant_jd_bullets:
             jd_emb = jd_embs[jd_idx]
 
             # Compute similarity with all resume bullets
-            similarities = util.cos_sim(jd_emb, resume_embs)[0]
+            similarities = cos_sim(jd_emb, resume_embs)[0]
             max_sim = max(similarities).item()
 
             # If there's high similarity (>0.65), this gap might be a false positive
@@ -184,7 +282,9 @@ def sentence_level_matching(resume_text, jd_text, identified_gaps, model):
 
     return false_positive_gaps
 
-def analyze_business_context(resume_text, jd_text, model):
+def analyze_business_context(resume_text, jd_text, model, nlp=None):
+    if nlp is None:
+        nlp = get_nlp()
     doc_resume = nlp(resume_text)
     doc_jd = nlp(jd_text)
     resume_context = [ent.text.lower() for ent in doc_resume.ents if ent.label_ in ["ORG", "NORP", "GPE", "PRODUCT"]]
@@ -192,23 +292,31 @@ def analyze_business_context(resume_text, jd_text, model):
     matches = set(resume_context) & set(jd_context)
     resume_emb = model.encode(resume_text)
     jd_emb = model.encode(jd_text)
-    context_sim = util.cos_sim(resume_emb, jd_emb)[0][0].item() * 100
+    context_sim = cos_sim(resume_emb, jd_emb)[0][0].item() * 100
     points = []
     points.append(f"Context similarity: {context_sim:.2f}% - {'Similar: Good industry match' if context_sim > 70 else 'Different: Partial alignment - action: Adjust resume'}.")
     points.append(f"Shared entities: {len(matches)} common (e.g., {', '.join(list(matches)[:2]) if matches else 'none'}) - {'Similar: Common background' if matches else 'Different: No shared - action: Add relevant details'}.")
     points.append(f"Overall context fit: {'Strong' if context_sim > 70 else 'Partial'} - action: Tailor to JD's environment.")
     return points  # 3 bullets
 
-def match_resume_jd(resume_file, jd_file_or_text, ontology_path, seniority_path):
+def match_resume_jd(resume_file, jd_file_or_text, ontology_path, seniority_path, budgets=None):
     """
     Match resume against job description with comprehensive error handling
 
+    resume_file: PDF/DOCX path, bytes, or a binary file-like object (e.g. a Streamlit upload)
+    jd_file_or_text: the same kinds of document source, or plain JD text
+    budgets: optional {name: cap} overriding ANALYSIS_BUDGETS for this call
+
     Returns: analysis dict or error dict with {'error': message, 'error_type': type}
     """
+    budgets = analysis_budgets(budgets)
     try:
         # Parse resume with validation
         try:
-            resume_text = parse_document(resume_file)
+            with stage('parse'):
+                # Repeat uploads come straight from the document cache
+                resume_doc = CachedDocument(resume_file)
+                resume_text = resume_doc.text
         except Exception as e:
             return {
                 'error': f'Failed to parse resume: {str(e)}',
@@ -218,10 +326,10 @@ def match_resume_jd(resume_file, jd_file_or_text, ontology_path, seniority_path)
 
         # Parse JD with validation
         try:
-            if os.path.isfile(jd_file_or_text): # If JD is a file path
-                jd_text = parse_document(jd_file_or_text)
-            else: # If JD is text
-                jd_text = clean_text(jd_file_or_text)
+            with stage('parse'):
+                # A file path, bytes or upload is parsed; plain text is cleaned
+                jd_doc = CachedDocument(jd_file_or_text)
+                jd_text = jd_doc.text
         except Exception as e:
             return {
                 'error': f'Failed to parse job description: {str(e)}',
@@ -259,85 +367,140 @@ def match_resume_jd(resume_file, jd_file_or_text, ontology_path, seniority_path)
 
     # Main processing with error handling
     try:
+        # Parse each distinct text once; every analyzer below shares these Docs
+        with stage('models'):
+            model = get_embedding_model()
+            docs = AnalysisContext(get_nlp())
+            # Lowercased text, line/sentence/token tables: derived once, shared by the analyzers
+            resume_view = TextDocument(resume_text, docs)
+            jd_view = TextDocument(jd_text, docs)
+
         # Detect industries for both resume and JD
-        resume_industries = detect_industry(resume_text)
-        jd_industries = detect_industry(jd_text)
-
-        resume_sections = extract_sections(resume_text)
-        jd_sections = extract_sections(jd_text)
-        resume_skills = extract_skills(resume_text, load_ontology(ontology_path))
-        jd_skills = extract_skills(jd_text, load_ontology(ontology_path))
-        resume_seniority = extract_seniority(resume_sections['experience'], load_seniority_levels(seniority_path))
-        jd_seniority = extract_seniority(jd_sections['experience'], load_seniority_levels(seniority_path))
-        resume_embs = get_embeddings([' '.join(resume_sections.get(k, [])) for k in ["skills", "experience", "education", "other"]])
-        jd_embs = get_embeddings([' '.join(jd_sections.get(k, [])) for k in ["skills", "experience", "education", "other"]])
-        score = compute_score(resume_embs, jd_embs)
+        with stage('industry'):
+            resume_industries = detect_industry(resume_view)
+            jd_industries = detect_industry(jd_view)
+
+        with stage('sections'):
+            resume_sections = resume_doc.sections(docs)
+            jd_sections = jd_doc.sections(docs)
+        with stage('skills'):
+            ontology_index = get_ontology_index(ontology_path, model)
+            resume_skills = resume_doc.skills(ontology_index, docs)
+            jd_skills = jd_doc.skills(ontology_index, docs)
+        with stage('seniority'):
+            seniority_levels = load_seniority_levels(seniority_path)
+            # Roles and dates are read once; seniority, progression and consistency share them
+            resume_timeline = extract_timeline(resume_sections['experience'], seniority_levels)
+            resume_seniority = extract_seniority(resume_sections['experience'], seniority_levels, resume_timeline)
+            jd_seniority = extract_seniority(jd_sections['experience'], seniority_levels)
+        with stage('embeddings'):
+            resume_embs = get_embeddings([' '.join(resume_sections.get(k, [])) for k in ["skills", "experience", "education", "other"]])
+            jd_embs = get_embeddings([' '.join(jd_sections.get(k, [])) for k in ["skills", "experience", "education", "other"]])
+            score = compute_score(resume_embs, jd_embs)
         seniority_points = analyze_seniority(resume_seniority, jd_seniority)
-        comp_analysis = analyze_competencies(resume_skills, jd_skills, model)
+        with stage('competencies'):
+            comp_analysis = analyze_competencies(resume_skills, jd_skills, model)
 
-        # Apply sentence-level matching to filter out false positive gaps
+        # Offsets, sentences and sections of every skill, from one scan per document
         initial_gaps = comp_analysis['gaps']
-        false_positive_gaps = sentence_level_matching(resume_text, jd_text, initial_gaps, model)
+        with stage('mentions'):
+            indexed_skills = list(resume_skills) + list(jd_skills) + list(initial_gaps)
+            resume_mentions = MentionIndex(resume_view, indexed_skills, sections=resume_sections)
+            jd_mentions = MentionIndex(jd_view, indexed_skills)
+
+        # Apply sentence-level matching to filter out false positive gaps
+        with stage('sentence_matching'):
+            false_positive_gaps = sentence_level_matching(resume_view, jd_view, initial_gaps, model, docs, jd_mentions)
 
         # Remove false positives from gaps and move them to matches
         filtered_gaps = [g for g in initial_gaps if g not in false_positive_gaps]
         comp_analysis['matches'].extend(false_positive_gaps)  # Add recovered skills to matches
 
         # Apply LLM validation as final validation layer (if API key available)
-        validated_gaps, llm_recovered_matches = validate_gaps_with_llm(
-            resume_text,
-            jd_text,
-            filtered_gaps,
-            comp_analysis['matches']
-        )
+        with stage('llm_validation'):
+            validated_gaps, llm_recovered_matches = validate_gaps_with_llm(
+                resume_text,
+                jd_text,
+                filtered_gaps,
+                comp_analysis['matches']
+            )
 
         # Update gaps and matches based on LLM validation
         comp_analysis['gaps'] = validated_gaps
         comp_analysis['matches'].extend(llm_recovered_matches)
 
-        context_points = analyze_business_context(resume_text, jd_text, model)
+        with stage('business_context'):
+            context_points = analyze_business_context(resume_text, jd_text, model, docs)
         role_fit_points = seniority_points + comp_analysis['points'] + context_points # Combine for 4-5+ bullets
 
         # NEW: Run free enhancement analyzers
-        resume_achievements = extract_achievements(resume_text)
-        resume_verb_analysis = analyze_action_verbs(resume_text, nlp)
-        resume_leadership = detect_leadership_language(resume_text, nlp)
-        resume_task_outcome = classify_task_vs_outcome(resume_text, nlp)
+        with stage('tier1.achievements'):
+            resume_achievements = extract_achievements(resume_view)
+        with stage('tier1.action_verbs'):
+            resume_verb_analysis = analyze_action_verbs(resume_text, docs)
+        with stage('tier1.leadership'):
+            resume_leadership = detect_leadership_language(resume_text, docs)
+        with stage('tier1.task_vs_outcome'):
+            resume_task_outcome = classify_task_vs_outcome(resume_text, docs)
 
         # Cluster skills to improve matching
-        resume_skill_clusters = cluster_skills(resume_skills, model)
-        jd_skill_clusters = cluster_skills(jd_skills, model)
+        # Reuse the skill embeddings from the competency stage
+        skill_embs = comp_analysis['skill_embeddings']
+        # One similarity pass per skill set yields both the clusters and the resume redundancies
+        with stage('tier1.skill_clusters'):
+            resume_skill_groups = group_similar_skills(resume_skills, model, embeddings=skill_embs['resume'])
+            resume_skill_clusters = resume_skill_groups['clusters']
+            jd_skill_clusters = group_similar_skills(jd_skills, model, embeddings=skill_embs['jd'])['clusters']
 
         # ATS keyword density analysis
-        ats_analysis = calculate_ats_keyword_density(resume_text, jd_text, jd_skills)
+        with stage('tier1.ats_keyword_density'):
+            ats_analysis = calculate_ats_keyword_density(resume_view, jd_view, jd_skills, resume_mentions, jd_mentions)
 
         # Tier 2 analyzers
-        section_scores = score_resume_sections(resume_sections, jd_skills, nlp)
-        skill_redundancies = detect_skill_redundancies(resume_skills, model)
-        skill_categorization = classify_hard_vs_soft_skills(comp_analysis['gaps'])
-        gap_context = extract_skill_context(resume_text, jd_text, comp_analysis['gaps'], model, nlp)
+        with stage('tier2.section_scores'):
+            section_scores = score_resume_sections(resume_sections, jd_skills, docs, resume_mentions)
+        with stage('tier2.skill_redundancies'):
+            skill_redundancies = resume_skill_groups['redundancies']
+        with stage('tier2.hard_vs_soft'):
+            skill_categorization = classify_hard_vs_soft_skills(comp_analysis['gaps'])
+        with stage('tier2.gap_context'):
+            gap_context = extract_skill_context(resume_text, jd_text, comp_analysis['gaps'], model, docs, jd_mentions,
+                                                max_gaps=budgets['max_gaps'])
 
         # Tier 3 analyzers
-        experience_progression = analyze_experience_progression(resume_text, nlp)
-        skill_cooccurrence = analyze_skill_cooccurrence(resume_skills, jd_skills, comp_analysis['gaps'])
-        readability = calculate_readability_score(resume_text, nlp)
-        scope_analysis = infer_scope_level(resume_text, jd_text)
-        consistency_check = check_consistency(resume_text, nlp)
+        with stage('tier3.experience_progression'):
+            experience_progression = analyze_experience_progression(resume_view, docs, resume_timeline)
+        with stage('tier3.skill_cooccurrence'):
+            skill_cooccurrence = analyze_skill_cooccurrence(resume_skills, jd_skills, comp_analysis['gaps'])
+        with stage('tier3.readability'):
+            readability = calculate_readability_score(resume_text, docs)
+        with stage('tier3.scope'):
+            scope_analysis = infer_scope_level(resume_view, jd_view)
+        with stage('tier3.consistency'):
+            consistency_check = check_consistency(resume_view, docs, resume_timeline)
 
         # Tier 4 analyzers
-        gap_severity = score_gap_severity(comp_analysis['gaps'], jd_text)
-        skill_evidence = assess_skill_evidence(resume_text, resume_skills, nlp)
-        keyword_placement = analyze_keyword_placement(resume_text, jd_skills)
-        bullet_quality = score_resume_bullets(resume_text, nlp)
+        with stage('tier4.gap_severity'):
+            gap_severity = score_gap_severity(comp_analysis['gaps'], jd_view, jd_mentions)
+        with stage('tier4.skill_evidence'):
+            skill_evidence = assess_skill_evidence(resume_text, resume_skills, docs, resume_mentions,
+                                                   max_skills=budgets['max_evidence_skills'])
+        with stage('tier4.keyword_placement'):
+            keyword_placement = analyze_keyword_placement(resume_view, jd_skills, resume_mentions,
+                                                          max_skills=budgets['max_placement_skills'])
+        with stage('tier4.bullet_quality'):
+            bullet_quality = score_resume_bullets(resume_text, docs, max_bullets=budgets['max_bullets'])
 
         # Ontology-based enhancements
         # Determine primary industry for certification detection
         primary_industry = jd_industries[0] if jd_industries else None
-        certification_gaps = find_certification_gaps(resume_text, jd_text, primary_industry)
+        with stage('certifications'):
+            certification_gaps = find_certification_gaps(resume_view, jd_view, primary_industry)
 
         # Beta-critical validators
-        education_validation = validate_education_requirements(resume_text, jd_text)
-        experience_validation = validate_years_experience(resume_seniority['years'], jd_text)
+        with stage('validators'):
+            education_validation = validate_education_requirements(resume_view, jd_view)
+            experience_validation = validate_years_experience(resume_seniority['years'], jd_view)
 
         return {
         "score": score,
@@ -345,7 +508,13 @@ def match_resume_jd(resume_file, jd_file_or_text, ontology_path, seniority_path)
         "comp_details": {
             'matches': comp_analysis['matches'],
             'gaps': comp_analysis['gaps'],
-            'similar': comp_analysis['similar']
+            'similar': comp_analysis['similar'],
+            # Remaining resume skills x semantic-pass gaps, as plain lists for JSON callers
+            'similarity': {
+                'resume_skills': comp_analysis['similarity']['resume_skills'],
+                'gaps': comp_analysis['similarity']['gaps'],
+                'matrix': np.asarray(comp_analysis['similarity']['matrix']).tolist()
+            }
         },
         "seniority_analysis": ' '.join(seniority_points),
         "comp_analysis": comp_analysis['analysis'],
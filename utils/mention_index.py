@@ -0,0 +1,119 @@
+"""
+Skill mention index
+
+Analyzers ask the same questions about every skill: how often does it occur,
+where first, in which sentences, in which sections. MentionIndex answers them
+from one multi-pattern scan of the document (utils/keyword_matcher), so each
+lookup is a dict access instead of another pass over the text.
+
+Matching is word-bounded, like the dictionary matcher: "sql" does not match
+inside "mysql". Offsets refer to the document text; sentence ids index
+TextDocument.sentences.
+"""
+from bisect import bisect_right
+from utils.keyword_matcher import KeywordMatcher
+from utils.parser import as_text_document
+
+
+def _section_ranges(document, sections):
+    """{section: sorted [(start, end)]} locating each section item in the document text"""
+    lower = document.lower
+    ranges = {}
+    for name, items in sections.items():
+        spans = []
+        cursor = 0
+        for item in items:
+            item = item.lower()
+            if not item:
+                continue
+            start = lower.find(item, cursor)
+            if start == -1:
+                start = lower.find(item)
+            if start == -1:
+                continue
+            spans.append((start, start + len(item)))
+            cursor = start + len(item)
+        ranges[name] = sorted(spans)
+    return ranges
+
+
+def _in_ranges(ranges, start, end):
+    i = bisect_right(ranges, (start, float('inf'))) - 1
+    return i >= 0 and ranges[i][0] <= start and end <= ranges[i][1]
+
+
+class MentionIndex:
+    """
+    Occurrences of a skill set in one document
+
+    text: string or TextDocument (pass one built with nlp for spaCy sentence ids)
+    sections: optional {name: [item text]} (e.g. extract_sections output) for section lookups
+    Skills queried without being indexed up front are scanned for on first use.
+    """
+
+    def __init__(self, text, skills=(), sections=None, nlp=None):
+        self.document = as_text_document(text, nlp)
+        self._mentions = {}  # skill -> [(start, end)] in text order
+        self._sections = _section_ranges(self.document, sections) if sections else {}
+        self._sentence_bounds = None
+        self.add(skills)
+
+    def add(self, skills):
+        """Index skills not indexed yet, all in a single scan"""
+        new_skills = [skill for skill in dict.fromkeys(skills) if skill not in self._mentions]
+        if not new_skills:
+            return
+        for skill in new_skills:
+            self._mentions[skill] = []
+        matcher = KeywordMatcher((skill, skill) for skill in new_skills)
+        for hit in matcher.scan(self.document):
+            self._mentions[hit.payload].append((hit.start, hit.end))
+
+    def mentions(self, skill):
+        """(start, end) offsets of every mention of skill"""
+        if skill not in self._mentions:
+            self.add([skill])
+        return self._mentions[skill]
+
+    def count(self, skill):
+        return len(self.mentions(skill))
+
+    def first(self, skill):
+        """Offset of the first mention, or -1"""
+        mentions = self.mentions(skill)
+        return mentions[0][0] if mentions else -1
+
+    def __contains__(self, skill):
+        return bool(self.mentions(skill))
+
+    def sentence_ids(self, skill):
+        """Ids (into document.sentences) of the sentences containing a mention, in order"""
+        if self._sentence_bounds is None:
+            sentences = self.document.sentences
+            self._sentence_bounds = ([s.start for s in sentences], [s.end for s in sentences])
+        starts, ends = self._sentence_bounds
+        ids = []
+        for start, end in self.mentions(skill):
+            i = bisect_right(starts, start) - 1
+            if i >= 0 and end <= ends[i] and (not ids or ids[-1] != i):
+                ids.append(i)
+        return ids
+
+    def sentences(self, skill):
+        sentences = self.document.sentences
+        return [sentences[i] for i in self.sentence_ids(skill)]
+
+    def sections(self, skill):
+        """Names of the sections with a mention of skill"""
+        return {
+            name for name, ranges in self._sections.items()
+            if any(_in_ranges(ranges, start, end) for start, end in self.mentions(skill))
+        }
+
+    def in_section(self, skill, *names):
+        """True if skill is mentioned in any of the named sections"""
+        return any(
+            _in_ranges(self._sections[name], start, end)
+            for name in names if name in self._sections
+            for start, end in self.mentions(skill)
+        )
@@ -1,14 +1,78 @@
-"""Cached model loading for performance optimization"""
-import streamlit as st
-import spacy
-from sentence_transformers import SentenceTransformer
-
-@st.cache_resource
-def load_spacy_model():
-    """Load spacy model once and cache it"""
-    return spacy.load("en_core_web_lg")
-
-@st.cache_resource
-def load_sentence_transformer():
-    """Load sentence transformer model once and cache it"""
-    return SentenceTransformer('stsb-roberta-large')
+"""
+Lazy, process-wide model loading
+
+Models load on first use rather than at import, so importing utils for
+non-NLP work (analytics, ontology helpers) stays cheap. The cache lives at
+module level instead of in st.cache_resource, so it works the same in
+Streamlit, the API, worker processes and scripts. Load times are recorded
+for monitoring.
+"""
+import threading
+import time
+
+SPACY_MODEL_NAME = "en_core_web_lg"
+SENTENCE_MODEL_NAME = "stsb-roberta-large"
+
+_models = {}
+_load_times = {}
+_lock = threading.RLock()  # get_embedding_model loads the sentence model under the lock
+
+
+def _get_or_load(name, loader):
+    model = _models.get(name)
+    if model is not None:
+        return model
+    with _lock:
+        # Another thread may have loaded it while we waited
+        model = _models.get(name)
+        if model is None:
+            start = time.perf_counter()
+            model = loader()
+            _load_times[name] = time.perf_counter() - start
+            _models[name] = model
+    return model
+
+
+def _load_spacy():
+    import spacy
+    return spacy.load(SPACY_MODEL_NAME)
+
+
+def _load_sentence_transformer():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(SENTENCE_MODEL_NAME)
+
+
+def _load_embedding_model():
+    from utils.embedding_cache import CachedEncoder
+    return CachedEncoder(get_sentence_model(), SENTENCE_MODEL_NAME)
+
+
+def get_nlp():
+    """spaCy pipeline, loaded on first call"""
+    return _get_or_load('spacy', _load_spacy)
+
+
+def get_sentence_model():
+    """Raw SentenceTransformer, loaded on first call"""
+    return _get_or_load('sentence_transformer', _load_sentence_transformer)
+
+
+def get_embedding_model():
+    """Sentence transformer wrapped in the content-addressed embedding cache"""
+    return _get_or_load('embedding_model', _load_embedding_model)
+
+
+def model_load_times():
+    """Seconds spent loading each model so far, keyed by model"""
+    return dict(_load_times)
+
+
+def loaded_models():
+    return sorted(_models)
+
+
+# Previous names, kept for existing callers
+load_spacy_model = get_nlp
+load_sentence_transformer = get_sentence_model
+load_embedding_model = get_embedding_model
@@ -0,0 +1,59 @@
+"""
+Per-request spaCy parse cache
+
+One match_resume_jd call hands the same resume and JD text to a dozen
+analyzers. AnalysisContext parses each distinct text once and gives every
+caller the same Doc and sentence list. It is callable like the spaCy pipeline,
+so it can be passed anywhere an `nlp` argument is expected.
+"""
+
+
+class DocumentContext:
+    """One text with its lazily parsed Doc and sentence spans"""
+
+    def __init__(self, text, nlp):
+        self.text = text
+        self._nlp = nlp
+        self._doc = None
+        self._sents = None
+
+    @property
+    def doc(self):
+        if self._doc is None:
+            self._doc = self._nlp(self.text)
+        return self._doc
+
+    @property
+    def sents(self):
+        if self._sents is None:
+            self._sents = list(self.doc.sents)
+        return self._sents
+
+
+class AnalysisContext:
+    """Registry of parsed documents for a single analysis request"""
+
+    def __init__(self, nlp):
+        self.nlp = nlp
+        self._documents = {}
+
+    def document(self, text):
+        """DocumentContext for text, created on first request"""
+        document = self._documents.get(text)
+        if document is None:
+            document = DocumentContext(text, self.nlp)
+            self._documents[text] = document
+        return document
+
+    def __call__(self, text):
+        return self.document(text).doc
+
+    def sents(self, text):
+        return self.document(text).sents
+
+
+def get_sentences(text, nlp):
+    """Sentence spans for text, reusing the cached list when nlp is an AnalysisContext"""
+    if isinstance(nlp, AnalysisContext):
+        return nlp.sents(text)
+    return list(nlp(text).sents)
@@ -0,0 +1,166 @@
+"""
+Numeric signals in resume and JD text
+
+Dollar amounts, percentages, team sizes, year ranges and years-of-experience
+requirements are read by several analyzers. One precompiled pattern finds
+them all in a single pass and emits typed facts with offsets, so the rules
+live in one place and each document is scanned once.
+
+Usage:
+    facts = numeric_facts(text)  # all facts, memoized on a TextDocument
+    budgets = [fact.millions for fact in numeric_facts(text, 'money')]
+"""
+import re
+from utils.parser import as_text_document
+
+_MONTH = (r'\b(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+          r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b')
+_MONTHS = {name: number for number, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1)}
+
+# Alternatives are tried in order at each position; a match consumes its text,
+# so the more specific year patterns come before the bare percent/headcount ones.
+_NUMERIC = re.compile(
+    # $5M, $500K, $2.5 million
+    r'(?P<money>\$\s*(?P<money_number>\d+(?:,\d{3})*(?:\.\d+)?)\s*(?P<money_unit>[KMB]|million|billion|thousand)?)'
+    # "5-7 years", "5 to 7 years"
+    r'|(?P<years_range>(?P<years_low>\d+)\s*(?:[-–—]|to)\s*(?P<years_high>\d+)\s*\+?\s*years?)'
+    # "2019 - 2023", "2020-present", "Jan 2014 to Dec. 2020", "2015-17". clean_text drops en/em
+    # dashes, leaving "2012  2018" (two spaces) or "2015present"; those count as a dash, and so
+    # does one space between month-dated ends ("may 2017 september 2020"). Two-digit ends need a dash.
+    rf'|(?P<year_range>(?:(?P<start_month>{_MONTH})\.?\s*)?(?<!\d)(?P<range_start>(?:19|20)\d{{2}})'
+    rf'(?:\s*(?P<range_dash>[-–—]|to|through)\s*| {{2,}}|(?(start_month) (?={_MONTH})|(?!))|)'
+    rf'(?:(?P<end_month>{_MONTH})\.?\s*)?'
+    rf'(?P<range_end>(?:19|20)\d{{2}}(?!\d)|(?(range_dash)\d{{2}}(?!\d)|(?!))|(?:present|current|now|date)\b))'
+    # "40%", "25 percent"
+    r'|(?P<percent>(?P<percent_number>\d+(?:\.\d+)?)\s*(?:%|percent))'
+    # "5+ years"
+    r'|(?P<years_plus>(?P<plus_number>\d+)\+\s*years?)'
+    # "5 years of experience"
+    r'|(?P<years_experience>(?P<experience_number>\d+)\s*years?\s+(?:of\s+)?(?:experience|exp))'
+    # "minimum of 5 years"
+    r'|(?P<years_minimum>minimum\s+(?:of\s+)?(?P<minimum_number>\d+)\s*years?)'
+    # "at least 5 years"
+    r'|(?P<years_at_least>at\s+least\s+(?P<at_least_number>\d+)\s*years?)'
+    # "team of 12", "managed 5 people" (not "led 40% growth", nor a year: "led 2020-2022 migration")
+    r'|(?P<headcount>(?:team of|team|managed|supervised|led|mentored|coached)\s+'
+    r'(?P<headcount_number>(?!(?:19|20)\d{2}(?!\d))\d+)(?!\d|\.\d|\s*(?:%|percent)))',
+    re.IGNORECASE
+)
+
+# years_required rules, strongest signal first
+YEARS_RULES = ['range', 'plus', 'minimum', 'at_least', 'experience']
+
+
+class NumericFact:
+    """
+    One numeric signal; start/end are offsets into the scanned text
+
+    kind            value                                          unit
+    money           amount as written (float)                      'K', 'M', 'million', ... or ''
+    percent         percentage (float)                             ''
+    headcount       team size (int)                                ''
+    year_range      (start_year, start_month, end_year, end_month) 'present' when ongoing, else ''
+    years_required  minimum years (int)                            rule from YEARS_RULES
+    number is the numeric text as written, without thousands separators.
+    Range months are 1-12 or None; end_year is None when the range is ongoing.
+    """
+
+    __slots__ = ('kind', 'value', 'unit', 'number', 'start', 'end')
+
+    def __init__(self, kind, value, unit, number, start, end):
+        self.kind = kind
+        self.value = value
+        self.unit = unit
+        self.number = number
+        self.start = start
+        self.end = end
+
+    @property
+    def millions(self):
+        """Money amount in millions (an amount without a unit is read as millions)"""
+        unit = self.unit.lower()
+        if 'k' in unit or 'thousand' in unit:
+            return self.value / 1000
+        if 'b' in unit or 'billion' in unit:
+            return self.value * 1000
+        return self.value
+
+    def __repr__(self):
+        return f"NumericFact({self.kind!r}, {self.value!r}, {self.unit!r}, {self.start}, {self.end})"
+
+
+def _month(name):
+    return _MONTHS[name[:3].lower()] if name else None
+
+
+def _years_fact(match, rule, number, value=None):
+    return NumericFact('years_required', int(number) if value is None else value, rule, number,
+                       match.start(), match.end())
+
+
+def scan_numeric_facts(text):
+    """All numeric facts in text, in text order (one regex pass)"""
+    facts = []
+    for match in _NUMERIC.finditer(text):
+        kind = match.lastgroup  # The outer group of the alternative that matched
+        if kind == 'money':
+            number = match.group('money_number').replace(',', '')
+            facts.append(NumericFact('money', float(number), match.group('money_unit') or '', number,
+                                     match.start(), match.end()))
+        elif kind == 'percent':
+            number = match.group('percent_number')
+            facts.append(NumericFact('percent', float(number), '', number, match.start(), match.end()))
+        elif kind == 'headcount':
+            number = match.group('headcount_number')
+            facts.append(NumericFact('headcount', int(number), '', number, match.start(), match.end()))
+        elif kind == 'year_range':
+            start_year, end = int(match.group('range_start')), match.group('range_end')
+            ongoing = not end.isdigit()
+            end_year = None if ongoing else int(end)
+            if end_year is not None and len(end) == 2:
+                # "2015-17": the end is in the start's century, or the next one ("1998-02")
+                end_year += start_year - start_year % 100
+                if end_year < start_year:
+                    end_year += 100
+            value = (start_year, _month(match.group('start_month')), end_year, _month(match.group('end_month')))
+            facts.append(NumericFact('year_range', value, 'present' if ongoing else '', match.group('year_range'),
+                                     match.start(), match.end()))
+        elif kind == 'years_range':
+            low, high = int(match.group('years_low')), int(match.group('years_high'))
+            facts.append(_years_fact(match, 'range', match.group('years_low'), min(low, high)))
+        elif kind == 'years_plus':
+            facts.append(_years_fact(match, 'plus', match.group('plus_number')))
+        elif kind == 'years_experience':
+            facts.append(_years_fact(match, 'experience', match.group('experience_number')))
+        elif kind == 'years_minimum':
+            facts.append(_years_fact(match, 'minimum', match.group('minimum_number')))
+        else:
+            facts.append(_years_fact(match, 'at_least', match.group('at_least_number')))
+    return facts
+
+
+def numeric_facts(text, kind=None):
+    """
+    Numeric facts in text (a string or TextDocument), optionally only one kind
+    The scan runs once per TextDocument and is shared by every analyzer reading it.
+    """
+    facts = as_text_document(text).derived('numeric_facts', lambda document: scan_numeric_facts(document.text))
+    if kind is None:
+        return facts
+    return [fact for fact in facts if fact.kind == kind]
+
+
+def years_required(text):
+    """
+    Minimum years of experience a JD asks for, or None
+    An explicit range ("5-7 years") wins; otherwise the first rule in
+    YEARS_RULES with a match gives its smallest value.
+    """
+    facts = numeric_facts(text, 'years_required')
+    for rule in YEARS_RULES:
+        values = [fact.value for fact in facts if fact.unit == rule]
+        if values:
+            # Ranges: the first one in the text, as before
+            return values[0] if rule == 'range' else min(values)
+    return None
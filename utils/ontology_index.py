@@ -0,0 +1,403 @@
+"""
+Precomputed ontology embedding index for skill extraction
+
+Encoding the full ESCO label list is the most expensive step of extract_skills,
+so the label embeddings are built once and stored on disk:
+- <key>.npy: L2-normalized label embeddings (float16 by default), memory-mapped on load
+- <key>.labels.json: label table aligned with the embedding rows
+- <key>.ivf.npz: optional inverted-file (IVF) partition for approximate search
+
+The key combines the ontology content hash and the sentence transformer name, so
+editing the CSV or switching models never serves stale vectors.
+
+Nearest-neighbour lookups go through a pluggable backend:
+- 'exact': chunked batched matrix multiply over all labels (default)
+- 'ivf': k-means partition of the label vectors; each query only scores the
+  nprobe closest partitions, so cost grows sub-linearly with ontology size
+
+Build offline with:
+    python -m utils.ontology_index data/ontologies/esco_skills_en.csv [--alt-labels] [--ivf]
+"""
+import hashlib
+import json
+import os
+import re
+import numpy as np
+from utils.model_cache import SENTENCE_MODEL_NAME
+
+# Anchored to the package root so the index is found whatever the working directory
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INDEX_DIR = os.environ.get('ROLEIQ_INDEX_DIR', os.path.join(PACKAGE_ROOT, 'data', 'indexes'))
+SEARCH_BACKEND = os.environ.get('ROLEIQ_SEARCH_BACKEND', 'exact')
+
+# Rows scored per matmul in exact search (bounds the float32 copy of a float16 memmap)
+EXACT_CHUNK_ROWS = 8192
+
+# Below this many labels an IVF partition costs more than it saves
+IVF_MIN_LABELS = 2000
+
+# Indexes already opened in this process, keyed by (index key, index dir)
+_loaded_indexes = {}
+
+# Ontology file hashes, keyed by (path, mtime_ns, size) so an unchanged CSV is hashed once
+_file_hashes = {}
+
+
+def load_ontology_labels(file_path, include_alt_labels=False):
+    """
+    Load the preferredLabel column of an ESCO-style CSV
+    With include_alt_labels, newline-separated altLabels are appended as extra rows
+    """
+    import pandas as pd  # Only needed when reading the CSV, not for cached indexes
+    df = pd.read_csv(file_path)
+    labels = df['preferredLabel'].tolist()  # Adjust if column differs
+
+    if include_alt_labels and 'altLabels' in df.columns:
+        seen = set(labels)
+        for alt_cell in df['altLabels'].dropna():
+            for alt in str(alt_cell).split('\n'):
+                alt = alt.strip()
+                if alt and alt not in seen:
+                    seen.add(alt)
+                    labels.append(alt)
+
+    return labels
+
+
+def file_sha256(file_path):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_file_sha256(file_path):
+    """file_sha256, recomputed only when the file's mtime or size changes"""
+    stat = os.stat(file_path)
+    stamp = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    digest = _file_hashes.get(stamp)
+    if digest is None:
+        digest = file_sha256(file_path)
+        _file_hashes[stamp] = digest
+    return digest
+
+
+def labels_sha256(labels):
+    """SHA-256 of an in-memory label list (used when no file path is available)"""
+    digest = hashlib.sha256()
+    for label in labels:
+        digest.update(str(label).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def index_key(content_hash, model_name=SENTENCE_MODEL_NAME, include_alt_labels=False):
+    """File stem for an index built from this ontology content and model"""
+    model_slug = re.sub(r'[^a-zA-Z0-9]+', '-', model_name).strip('-')
+    suffix = '_alt' if include_alt_labels else ''
+    return f"{content_hash[:16]}_{model_slug}{suffix}"
+
+
+def normalize_rows(vectors):
+    """L2-normalize rows so cosine similarity becomes a dot product"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def cos_sim(a, b):
+    """Cosine similarity matrix between the rows of a and b (numpy; no torch import)"""
+    return normalize_rows(a) @ normalize_rows(b).T
+
+
+def _merge_topk(best_scores, best_ids, scores, ids, k):
+    """Merge a new block of candidate scores into the running top-k per query"""
+    scores = np.concatenate([best_scores, scores], axis=1)
+    ids = np.concatenate([best_ids, ids], axis=1)
+    if scores.shape[1] > k:
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, keep, axis=1)
+        ids = np.take_along_axis(ids, keep, axis=1)
+    return scores, ids
+
+
+def _sort_topk(scores, ids):
+    order = np.argsort(-scores, axis=1)
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+
+class ExactSearch:
+    """Brute-force cosine search: one batched matmul per chunk of label rows"""
+
+    name = 'exact'
+
+    def __init__(self, embeddings, chunk_rows=EXACT_CHUNK_ROWS):
+        self.embeddings = embeddings
+        self.chunk_rows = chunk_rows
+
+    def search(self, queries, k=1):
+        queries = normalize_rows(queries)
+        n_labels = self.embeddings.shape[0]
+        k = min(k, n_labels)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+
+        for start in range(0, n_labels, self.chunk_rows):
+            block = np.asarray(self.embeddings[start:start + self.chunk_rows], dtype=np.float32)
+            scores = queries @ block.T
+            ids = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+            best_scores, best_ids = _merge_topk(best_scores, best_ids, scores, ids, k)
+
+        return _sort_topk(best_scores, best_ids)
+
+
+class IVFSearch:
+    """
+    Inverted-file approximate search
+    Label vectors are partitioned with k-means; a query scores the centroids,
+    then only the labels in its nprobe closest partitions.
+    """
+
+    name = 'ivf'
+
+    def __init__(self, embeddings, centroids, list_offsets, list_ids, nprobe=16):
+        self.embeddings = embeddings
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+        self.nprobe = nprobe
+
+    @classmethod
+    def build(cls, embeddings, nlist=None, nprobe=16, seed=0):
+        from sklearn.cluster import MiniBatchKMeans
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        nlist = nlist or max(1, int(np.sqrt(len(vectors))))
+        kmeans = MiniBatchKMeans(n_clusters=nlist, random_state=seed, n_init=3, batch_size=4096)
+        assignments = kmeans.fit_predict(vectors)
+        centroids = normalize_rows(kmeans.cluster_centers_)
+
+        # CSR-style posting lists: ids of partition p are list_ids[offsets[p]:offsets[p+1]]
+        list_ids = np.argsort(assignments, kind='stable').astype(np.int64)
+        counts = np.bincount(assignments, minlength=nlist)
+        list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(embeddings, centroids, list_offsets, list_ids, nprobe)
+
+    def save(self, path):
+        np.savez(path, centroids=self.centroids, list_offsets=self.list_offsets, list_ids=self.list_ids)
+
+    @classmethod
+    def load(cls, embeddings, path, nprobe=16):
+        data = np.load(path)
+        return cls(embeddings, data['centroids'], data['list_offsets'], data['list_ids'], nprobe)
+
+    def search(self, queries, k=1):
+        queries = normalize_rows(queries)
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :nprobe]
+
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+
+        for qi, query in enumerate(queries):
+            # Sorted ids keep memmap reads sequential
+            ids = np.sort(np.concatenate([
+                self.list_ids[self.list_offsets[p]:self.list_offsets[p + 1]] for p in probes[qi]
+            ]))
+            if len(ids) == 0:
+                continue
+            scores = np.asarray(self.embeddings[ids], dtype=np.float32) @ query
+            top = min(k, len(ids))
+            keep = np.argpartition(-scores, top - 1)[:top]
+            keep = keep[np.argsort(-scores[keep])]
+            all_scores[qi, :top] = scores[keep]
+            all_ids[qi, :top] = ids[keep]
+
+        return all_scores, all_ids
+
+
+class OntologyIndex:
+    """Ontology labels with their normalized embeddings (rows aligned with labels)"""
+
+    def __init__(self, labels, embeddings, model_name=SENTENCE_MODEL_NAME, key=None, backend=None):
+        self.labels = labels
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.key = key
+        self.backend = backend or ExactSearch(embeddings)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def search(self, query_embs, k=1):
+        """
+        Top-k nearest labels for a batch of query embeddings
+        Returns: (scores, ids) arrays of shape (n_queries, k), best match first.
+        Missing neighbours (IVF with sparse partitions) have id -1.
+        """
+        if len(query_embs) == 0 or len(self) == 0:
+            return np.zeros((0, k), dtype=np.float32), np.zeros((0, k), dtype=np.int64)
+        return self.backend.search(query_embs, k)
+
+    def top_matches(self, query_embs, k=5):
+        """Top-k (label, score) pairs for each query embedding"""
+        scores, ids = self.search(query_embs, k)
+        return [
+            [(self.labels[i], float(score)) for score, i in zip(row_scores, row_ids) if i >= 0]
+            for row_scores, row_ids in zip(scores, ids)
+        ]
+
+
+def _index_paths(key, index_dir):
+    return (
+        os.path.join(index_dir, f"{key}.npy"),
+        os.path.join(index_dir, f"{key}.labels.json")
+    )
+
+
+def _ivf_path(key, index_dir):
+    return os.path.join(index_dir, f"{key}.ivf.npz")
+
+
+def _encode_labels(labels, model, dtype):
+    # Bypass the embedding cache: a one-off full label pass would only evict hot phrases
+    encoder = getattr(model, 'uncached', model)
+    return normalize_rows(encoder.encode(labels, batch_size=256)).astype(dtype)
+
+
+def use_backend(index, backend, index_dir=INDEX_DIR, nprobe=16):
+    """
+    Switch an index to the 'exact' or 'ivf' search backend
+    The IVF partition is built on first use and persisted next to the index.
+    Small ontologies stay on exact search.
+    """
+    if backend == 'ivf' and len(index) >= IVF_MIN_LABELS:
+        path = _ivf_path(index.key, index_dir) if index.key else None
+        if path and os.path.exists(path):
+            index.backend = IVFSearch.load(index.embeddings, path, nprobe)
+        else:
+            index.backend = IVFSearch.build(index.embeddings, nprobe=nprobe)
+            if path:
+                index.backend.save(path)
+    elif backend in ('exact', 'ivf'):
+        index.backend = ExactSearch(index.embeddings)
+    else:
+        raise ValueError(f"Unknown search backend: {backend}")
+    return index
+
+
+def _save_index(key, labels, embeddings, model_name, index_dir):
+    os.makedirs(index_dir, exist_ok=True)
+    emb_path, labels_path = _index_paths(key, index_dir)
+
+    # Write to temp files first so a crashed build never leaves a half-written index
+    np.save(emb_path + '.tmp.npy', embeddings)
+    os.replace(emb_path + '.tmp.npy', emb_path)
+    with open(labels_path + '.tmp', 'w') as f:
+        json.dump({'model': model_name, 'labels': labels}, f)
+    os.replace(labels_path + '.tmp', labels_path)
+
+
+def _open_index(key, model_name, index_dir):
+    emb_path, labels_path = _index_paths(key, index_dir)
+    if not (os.path.exists(emb_path) and os.path.exists(labels_path)):
+        return None
+
+    with open(labels_path, 'r') as f:
+        labels = json.load(f)['labels']
+    embeddings = np.load(emb_path, mmap_mode='r')
+
+    if embeddings.shape[0] != len(labels):
+        return None  # Corrupt or mismatched index - caller rebuilds it
+
+    return OntologyIndex(labels, embeddings, model_name, key)
+
+
+def build_ontology_index(ontology_path, model, model_name=SENTENCE_MODEL_NAME,
+                         index_dir=INDEX_DIR, dtype=np.float16, include_alt_labels=False):
+    """
+    Encode every ontology label once and persist the index to index_dir
+    Returns: OntologyIndex backed by the freshly written memory-mapped file
+    """
+    labels = [str(label) for label in load_ontology_labels(ontology_path, include_alt_labels)]
+    key = index_key(cached_file_sha256(ontology_path), model_name, include_alt_labels)
+    _save_index(key, labels, _encode_labels(labels, model, dtype), model_name, index_dir)
+
+    index = _open_index(key, model_name, index_dir)
+    _loaded_indexes[(key, index_dir)] = index
+    return index
+
+
+def get_ontology_index(ontology, model, model_name=SENTENCE_MODEL_NAME, index_dir=INDEX_DIR,
+                       build_missing=True, include_alt_labels=False, backend=None):
+    """
+    Return the embedding index for an ontology, loading it lazily
+
+    Args:
+        ontology: path to the ontology CSV, or an in-memory list of labels
+        model: sentence transformer used only when the index has to be built
+        build_missing: encode and persist the labels if no index exists yet
+        include_alt_labels: index ESCO altLabels as well (CSV paths only)
+        backend: 'exact' or 'ivf' (defaults to ROLEIQ_SEARCH_BACKEND)
+
+    Returns: OntologyIndex, or None if it is missing and build_missing is False
+    """
+    if isinstance(ontology, OntologyIndex):
+        return ontology
+
+    if isinstance(ontology, str):
+        key = index_key(cached_file_sha256(ontology), model_name, include_alt_labels)
+        labels = None
+    else:
+        labels = [str(label) for label in ontology]
+        key = index_key(labels_sha256(labels), model_name)
+
+    cache_key = (key, index_dir)
+    if cache_key in _loaded_indexes:
+        return _loaded_indexes[cache_key]
+
+    index = _open_index(key, model_name, index_dir)
+    if index is None:
+        if not build_missing:
+            return None
+        if labels is None:
+            index = build_ontology_index(ontology, model, model_name, index_dir,
+                                         include_alt_labels=include_alt_labels)
+        else:
+            _save_index(key, labels, _encode_labels(labels, model, np.float16), model_name, index_dir)
+            index = _open_index(key, model_name, index_dir)
+
+    use_backend(index, backend or SEARCH_BACKEND, index_dir)
+    _loaded_indexes[cache_key] = index
+    return index
+
+
+if __name__ == '__main__':
+    import argparse
+    from utils.model_cache import get_sentence_model
+
+    parser = argparse.ArgumentParser(description='Build the ontology embedding index')
+    parser.add_argument('ontology_path', help='ESCO-style CSV with a preferredLabel column')
+    parser.add_argument('--index-dir', default=INDEX_DIR)
+    parser.add_argument('--float32', action='store_true', help='Store float32 instead of float16')
+    parser.add_argument('--alt-labels', action='store_true', help='Also index ESCO altLabels')
+    parser.add_argument('--ivf', action='store_true', help='Also build the IVF partition')
+    args = parser.parse_args()
+
+    built = build_ontology_index(
+        args.ontology_path,
+        get_sentence_model(),
+        index_dir=args.index_dir,
+        dtype=np.float32 if args.float32 else np.float16,
+        include_alt_labels=args.alt_labels
+    )
+    if args.ivf:
+        use_backend(built, 'ivf', args.index_dir)
+    print(f"Indexed {len(built)} labels -> {_index_paths(built.key, args.index_dir)[0]} ({built.backend.name} search)")
@@ -1,22 +1,87 @@
 import json
 import os
 import re
+import threading
+import time
+from utils.keyword_matcher import dictionary_hits, get_dictionary_matcher
+
+JOB_TITLES_PATH = 'data/ontologies/job_titles.json'
+CERTIFICATIONS_PATH = 'data/ontologies/certifications.json'
+# Seconds between mtime checks; lookups in between touch no files at all
+RELOAD_CHECK_SECONDS = float(os.environ.get('ROLEIQ_ONTOLOGY_RELOAD_SECONDS', '5'))
+
+class OntologyFile:
+    """
+    A JSON ontology parsed once, with derived lookup structures built by build(data)
+    The file is stat'ed at most every RELOAD_CHECK_SECONDS and re-read only when its
+    mtime changes. A missing file loads as {} (and is picked up once it appears).
+    """
+
+    def __init__(self, path, build=None):
+        self.path = path
+        self._build = build or (lambda data: data)
+        self.version = None  # mtime_ns of the loaded file, None while missing
+        self._value = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _fresh(self, now):
+        return self._checked_at is not None and now - self._checked_at < RELOAD_CHECK_SECONDS
+
+    def get(self):
+        now = time.monotonic()
+        if self._fresh(now):
+            return self._value
+        with self._lock:
+            if not self._fresh(now):
+                try:
+                    mtime = os.stat(self.path).st_mtime_ns
+                except OSError:
+                    mtime = None
+                if self._checked_at is None or mtime != self.version:
+                    data = {}
+                    if mtime is not None:
+                        with open(self.path, 'r') as f:
+                            data = json.load(f)
+                    self._value = self._build(data)
+                    self.version = mtime
+                self._checked_at = now
+        return self._value
+
+class JobTitleIndex:
+    """Job title taxonomy plus its variation -> canonical reverse map"""
+
+    def __init__(self, job_titles):
+        self.job_titles = job_titles
+        self.variation_to_canonical = {
+            variation: canonical
+            for canonical, data in job_titles.items()
+            for variation in data.get('variations', [])
+        }
+
+    def canonical(self, text):
+        """Canonical title for an exact (case-insensitive) variation, or None"""
+        return self.variation_to_canonical.get(text.lower())
+
+_job_titles = OntologyFile(JOB_TITLES_PATH, JobTitleIndex)
+_certifications = OntologyFile(CERTIFICATIONS_PATH)
 
 def load_job_titles():
-    """Load job title taxonomy"""
-    ontology_path = 'data/ontologies/job_titles.json'
-    if os.path.exists(ontology_path):
-        with open(ontology_path, 'r') as f:
-            return json.load(f)
-    return {}
+    """Load job title taxonomy (shared; do not modify)"""
+    return _job_titles.get().job_titles
+
+def job_title_index():
+    return _job_titles.get()
 
 def load_certifications():
-    """Load certification database"""
-    ontology_path = 'data/ontologies/certifications.json'
-    if os.path.exists(ontology_path):
-        with open(ontology_path, 'r') as f:
-            return json.load(f)
-    return {}
+    """Load certification database (shared; do not modify)"""
+    return _certifications.get()
+
+def ontology_versions():
+    """(job titles, certifications) file versions, for caches built from both"""
+    _job_titles.get()
+    _certifications.get()
+    return _job_titles.version, _certifications.version
 
 def normalize_job_title(title_text):
     """
@@ -26,34 +91,30 @@ def normalize_job_title(title_text):
     if not title_text:
         return None, None, 0.0
 
-    job_titles = load_job_titles()
     title_lower = title_text.lower().strip()
+    hits = dictionary_hits(title_text)
 
     best_match = None
     best_confidence = 0.0
-    detected_level = None
-
-    for canonical, data in job_titles.items():
-        variations = data.get('variations', [])
-        level_indicators = data.get('level_indicators', {})
-
-        # Check for exact variation match
-        for variation in variations:
-            if variation in title_lower:
-                confidence = len(variation) / len(title_lower)  # Partial match scoring
-
-                if confidence > best_confidence:
-                    best_match = canonical
-                    best_confidence = confidence
-
-                    # Detect seniority level
-                    for level, keywords in level_indicators.items():
-                        for keyword in keywords:
-                            if keyword in title_lower:
-                                detected_level = level
-                                break
-                        if detected_level:
-                            break
+    best_order = None
+
+    # Variations found as whole words; the longest wins, ties go to the first listed
+    for hit in hits:
+        if hit.kind != 'title':
+            continue
+        _, canonical, order = hit.payload
+        confidence = (hit.end - hit.start) / len(title_lower)  # Partial match scoring
+        if confidence > best_confidence or (confidence == best_confidence and order < best_order):
+            best_match = canonical
+            best_confidence = confidence
+            best_order = order
+
+    # Detect seniority level: the first level (as listed) with an indicator in the title
+    level_ranks = [
+        (hit.payload[3], hit.payload[2]) for hit in hits
+        if hit.kind == 'title_level' and hit.payload[1] == best_match
+    ]
+    detected_level = min(level_ranks)[1] if level_ranks else None
 
     return best_match, detected_level, best_confidence
 
@@ -61,12 +122,16 @@ def detect_certifications(text, industry=None):
     """
     Detect certifications mentioned in text
     Returns: dict with 'critical' and 'valuable' certifications found
+    text may be a string or a TextDocument; names, full names and aliases
+    are matched as whole words.
     """
     if not text:
         return {'critical': [], 'valuable': []}
 
-    certifications_db = load_certifications()
-    text_lower = text.lower()
+    hits = dictionary_hits(text, 'certification')
+    certifications_db = get_dictionary_matcher().certifications
+    # Keyed by value, not identity: hits memoized on a document outlive a matcher rebuilt after a reload
+    mentioned = {(hit.payload[1], hit.payload[2], hit.payload[3]['name']) for hit in hits}
 
     found = {
         'critical': [],
@@ -84,7 +149,7 @@ def detect_certifications(text, industry=None):
 
         # Check critical certifications
         for cert in industry_certs.get('critical', []):
-            if _cert_in_text(cert, text_lower):
+            if (industry_name, 'critical', cert['name']) in mentioned:
                 found['critical'].append({
                     'name': cert['name'],
                     'full_name': cert['full_name'],
@@ -93,7 +158,7 @@ def detect_certifications(text, industry=None):
 
         # Check valuable certifications
         for cert in industry_certs.get('valuable', []):
-            if _cert_in_text(cert, text_lower):
+            if (industry_name, 'valuable', cert['name']) in mentioned:
                 found['valuable'].append({
                     'name': cert['name'],
                     'full_name': cert['full_name'],
@@ -106,23 +171,6 @@ def detect_certifications(text, industry=None):
 
     return found
 
-def _cert_in_text(cert, text_lower):
-    """Check if certification is mentioned in text"""
-    # Check main name
-    if cert['name'].lower() in text_lower:
-        return True
-
-    # Check full name
-    if cert['full_name'].lower() in text_lower:
-        return True
-
-    # Check aliases
-    for alias in cert.get('aliases', []):
-        if alias.lower() in text_lower:
-            return True
-
-    return False
-
 def _dedupe_certs(cert_list):
     """Remove duplicate certifications"""
     seen = set()
@@ -200,29 +248,17 @@ def enhance_skill_matching(resume_skills, jd_skills):
     Enhance skill matching by normalizing job titles found in skill lists
     Returns: (additional_matches, additional_gaps)
     """
-    job_titles = load_job_titles()
+    index = job_title_index()
 
     additional_matches = []
     additional_gaps = []
 
-    # Build a flat list of all title variations
-    all_variations = {}
-    for canonical, data in job_titles.items():
-        for variation in data.get('variations', []):
-            all_variations[variation] = canonical
-
-    # Check if any "skills" are actually job title variations
-    for resume_skill in resume_skills:
-        resume_skill_lower = resume_skill.lower()
-        for jd_skill in jd_skills:
-            jd_skill_lower = jd_skill.lower()
-
-            # Check if both are job title variations
-            resume_canonical = all_variations.get(resume_skill_lower)
-            jd_canonical = all_variations.get(jd_skill_lower)
-
-            if resume_canonical and jd_canonical and resume_canonical == jd_canonical:
-                if resume_skill not in additional_matches:
-                    additional_matches.append(resume_skill)
+    # Resume "skills" that are variations of a title the JD also names (set intersection on canonicals)
+    jd_canonicals = {index.canonical(jd_skill) for jd_skill in jd_skills}
+    jd_canonicals.discard(None)
+    if jd_canonicals:
+        for resume_skill in resume_skills:
+            if index.canonical(resume_skill) in jd_canonicals and resume_skill not in additional_matches:
+                additional_matches.append(resume_skill)
 
     return additional_matches, additional_gaps
@@ -1,76 +1,440 @@
+import io
+import logging
+import os
 import re
 import fitz  # PyMuPDF for PDF
 from docx import Document  # For DOCX
-from utils.model_cache import load_spacy_model
+from utils.model_cache import get_nlp
+from utils.nlp_context import get_sentences
 
-nlp = load_spacy_model()
+logger = logging.getLogger(__name__)
+
+# Bump when parsing or sectioning output changes; invalidates cached documents (utils/document_cache.py)
+PARSER_VERSION = 1
+
+# Hard limits per document, so a 200-page upload costs the same as a long resume
+MAX_PDF_PAGES = int(os.environ.get('ROLEIQ_MAX_PDF_PAGES', '30'))
+MAX_DOCUMENT_CHARS = int(os.environ.get('ROLEIQ_MAX_DOCUMENT_CHARS', '200000'))
+
+_WHITESPACE = re.compile(r'\s+')
+# Preserve hyphens, dashes, and plus signs for year ranges like "5-7+" or "5+"
+_STRIP_CHARS = re.compile(r'[^\w\s\-+]')
 
 def clean_text(text):
-    text = re.sub(r'\s+', ' ', text.lower().strip())
-    # Preserve hyphens, dashes, and plus signs for year ranges like "5-7+" or "5+"
-    text = re.sub(r'[^\w\s\-+]', '', text)
+    text = _WHITESPACE.sub(' ', text.lower().strip())
+    text = _STRIP_CHARS.sub('', text)
     return text
 
-def parse_document(file_path):
-    if file_path.endswith('.pdf'):
-        doc = fitz.open(file_path)
-        text = ""
-        for page in doc:
-            text += page.get_text("text") + "\n"
+def read_bytes(source):
+    """Raw bytes from bytes or a binary file-like object (e.g. a Streamlit UploadedFile)"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return source.read()
+
+def is_document_source(source):
+    """True for a file path, bytes or a file-like object; False for plain JD text"""
+    if isinstance(source, str):
+        return os.path.isfile(source)
+    return isinstance(source, (bytes, bytearray, memoryview)) or hasattr(source, 'read')
+
+def detect_file_type(name=None, data=None):
+    """'pdf' or 'docx' from the file name, falling back to the file signature"""
+    if name:
+        lowered = name.lower()
+        if lowered.endswith('.pdf'):
+            return 'pdf'
+        if lowered.endswith('.docx'):
+            return 'docx'
+    if data:
+        if data.startswith(b'%PDF'):
+            return 'pdf'
+        if data.startswith(b'PK\x03\x04'):  # DOCX is a zip container
+            return 'docx'
+    raise ValueError("Unsupported file type")
+
+def _open_source(source, filename=None):
+    """(file_type, path or bytes) for a path, bytes or file-like source"""
+    if isinstance(source, str):
+        return detect_file_type(source), source
+    data = read_bytes(source)
+    return detect_file_type(filename or getattr(source, 'name', None), data), data
+
+def _pdf_pages(source, max_pages):
+    """Yield (page_number, page) one at a time from a PDF path or bytes, up to max_pages"""
+    doc = fitz.open(source) if isinstance(source, str) else fitz.open(stream=source, filetype='pdf')
+    try:
+        if doc.page_count > max_pages:
+            logger.warning("PDF has %d pages; only the first %d are parsed.", doc.page_count, max_pages)
+        for page_number in range(min(doc.page_count, max_pages)):
+            yield page_number, doc.load_page(page_number)
+    finally:
         doc.close()
-        return clean_text(text)
-    elif file_path.endswith('.docx'):
-        doc = Document(file_path)
-        text = ""
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-        return clean_text(text)
+
+def _docx_paragraphs(source):
+    doc = Document(source if isinstance(source, str) else io.BytesIO(source))
+    return doc.paragraphs
+
+def _raw_chunks(file_type, source, max_pages):
+    """Raw text one PDF page (or one DOCX paragraph) at a time"""
+    if file_type == 'pdf':
+        for _, page in _pdf_pages(source, max_pages):
+            yield page.get_text("text")
+    else:
+        for para in _docx_paragraphs(source):
+            yield para.text
+
+def iter_document_text(source, filename=None, max_pages=MAX_PDF_PAGES, max_chars=MAX_DOCUMENT_CHARS):
+    """
+    Yield cleaned text chunks (one per PDF page / DOCX paragraph), stopping at max_chars
+    Joined with spaces, the chunks match clean_text over the whole document (up to spacing at chunk edges).
+    """
+    file_type, data = _open_source(source, filename)
+    remaining = max_chars
+    for raw in _raw_chunks(file_type, data, max_pages):
+        chunk = clean_text(raw)
+        if not chunk:
+            continue
+        if len(chunk) >= remaining:
+            yield chunk[:remaining]
+            return
+        remaining -= len(chunk) + 1  # +1 for the joining space
+        yield chunk
+
+def parse_document(source, filename=None, max_pages=MAX_PDF_PAGES, max_chars=MAX_DOCUMENT_CHARS):
+    """
+    Extract clean text from a PDF or DOCX
+    source: file path, bytes, or a binary file-like object; in-memory sources never touch disk
+    filename: used to detect the type of in-memory sources (defaults to source.name, then the file signature)
+    PDFs are read a page at a time and capped at max_pages; the text is capped at max_chars.
+    """
+    return ' '.join(iter_document_text(source, filename, max_pages, max_chars))
+
+# Section header keywords, checked in this order
+SECTION_KEYWORDS = {
+    'experience': ['experience', 'work history', 'employment', 'professional background',
+                   'work experience', 'career history', 'employment history'],
+    'skills': ['skills', 'technical skills', 'core competencies', 'qualifications',
+               'expertise', 'proficiencies', 'capabilities'],
+    'education': ['education', 'academic background', 'academic credentials',
+                  'degrees', 'certifications', 'training']
+}
+
+# A line longer than this is content, however it is formatted
+MAX_HEADER_WORDS = 6
+# Font size ratio over the body text that marks a PDF header
+HEADER_SIZE_RATIO = 1.15
+
+def classify_header(text):
+    """Section name for a header line (any case), or None"""
+    text = text.lower()
+    for section, keywords in SECTION_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            return section
+    return None
+
+class LayoutLine:
+    """One line of source text with the formatting cues used to spot headers"""
+
+    def __init__(self, text, block, size=None, bold=False, heading_style=False):
+        self.text = text
+        self.block = block  # Lines in the same block belong to the same paragraph
+        self.size = size
+        self.bold = bold
+        self.heading_style = heading_style
+
+def _pdf_layout_lines(source, max_pages):
+    for page_number, page in _pdf_pages(source, max_pages):
+        for block_number, block in enumerate(page.get_text("dict")['blocks']):
+            if block.get('type') != 0:  # Image block
+                continue
+            for line in block['lines']:
+                spans = [span for span in line['spans'] if span['text'].strip()]
+                if not spans:
+                    continue
+                yield LayoutLine(
+                    ''.join(span['text'] for span in line['spans']),
+                    block=(page_number, block_number),
+                    size=max(span['size'] for span in spans),
+                    # Flag bit 4 is bold; some fonts only say so in their name
+                    bold=all(span['flags'] & 16 or 'bold' in span['font'].lower() for span in spans)
+                )
+
+def _docx_layout_lines(source):
+    for number, para in enumerate(_docx_paragraphs(source)):
+        runs = [run for run in para.runs if run.text.strip()]
+        sizes = [run.font.size.pt for run in runs if run.font.size is not None]
+        style = para.style.name if para.style is not None else ''
+        yield LayoutLine(
+            para.text,
+            block=number,
+            size=max(sizes) if sizes else None,
+            bold=bool(runs) and all(run.bold for run in runs),
+            heading_style=style.startswith(('Heading', 'Title'))
+        )
+
+def _text_layout_lines(text):
+    for number, line in enumerate(text.splitlines()):
+        yield LayoutLine(line, block=number)
+
+def _body_font_size(lines):
+    """Most common font size, weighted by characters"""
+    weights = {}
+    for line in lines:
+        if line.size is not None:
+            size = round(line.size, 1)
+            weights[size] = weights.get(size, 0) + len(line.text)
+    return max(weights, key=weights.get) if weights else None
+
+def _layout_header(line, clean, body_size):
+    """Section name if line is a section header, judged by its formatting"""
+    if len(clean.split()) > MAX_HEADER_WORDS:
+        return None
+    section = classify_header(clean)
+    if section is None:
+        return None
+    raw = line.text.strip()
+    letters = [c for c in raw if c.isalpha()]
+    has_cue = (
+        line.heading_style
+        or line.bold
+        or (body_size is not None and line.size is not None and line.size >= body_size * HEADER_SIZE_RATIO)
+        or (letters and all(c.isupper() for c in letters))
+        or raw.endswith(':')
+        # A bare keyword on its own line ("Experience") is a header even without formatting
+        or clean in SECTION_KEYWORDS[section]
+    )
+    return section if has_cue else None
+
+class LayoutDocument:
+    """
+    Cleaned document text plus the sections found from its layout
+
+    text: same cleaned text as parse_document
+    sections: {'experience', 'skills', 'education', 'other'} -> list of paragraph texts
+    section_spans: [{'section', 'header', 'start', 'end'}] character offsets into text
+    has_headers: whether any section header was recognised
+    """
+
+    def __init__(self, lines, max_chars=MAX_DOCUMENT_CHARS):
+        lines = list(lines)
+        body_size = _body_font_size(lines)
+        pieces = []
+        length = 0
+        self.sections = {"experience": [], "skills": [], "education": [], "other": []}
+        self.section_spans = []
+        current = {'section': 'other', 'header': None, 'start': 0, 'end': 0}
+        paragraph = []
+        paragraph_block = None
+        all_paragraphs = []
+
+        def flush_paragraph():
+            if paragraph:
+                self.sections[current['section']].append(' '.join(paragraph))
+                all_paragraphs.append(' '.join(paragraph))
+                paragraph.clear()
+
+        for line in lines:
+            clean = clean_text(line.text)
+            if not clean:
+                continue
+            clean = clean[:max_chars - length - (1 if pieces else 0)]
+            if not clean:
+                break
+            start = length + (1 if pieces else 0)
+            pieces.append(clean)
+            length = start + len(clean)
+
+            section = _layout_header(line, clean, body_size)
+            if section is not None:
+                flush_paragraph()
+                if current['end'] > current['start']:
+                    self.section_spans.append(current)
+                current = {'section': section, 'header': clean, 'start': start, 'end': length}
+                continue
+
+            if line.block != paragraph_block:
+                flush_paragraph()
+                paragraph_block = line.block
+            paragraph.append(clean)
+            current['end'] = length
+
+        flush_paragraph()
+        if current['end'] > current['start']:
+            self.section_spans.append(current)
+
+        self.text = ' '.join(pieces)
+        self.has_headers = any(span['header'] for span in self.section_spans)
+
+        # Same fallback as the sentence-based pass: no experience section means the whole document
+        if not self.sections["experience"]:
+            self.sections["experience"] = all_paragraphs
+
+def parse_layout(source, filename=None, max_pages=MAX_PDF_PAGES, max_chars=MAX_DOCUMENT_CHARS):
+    """
+    Parse a PDF/DOCX (path, bytes or file-like) into a LayoutDocument
+    Headers come from PDF font size/bold and DOCX heading styles/bold runs, before any NLP.
+    """
+    file_type, data = _open_source(source, filename)
+    if file_type == 'pdf':
+        lines = _pdf_layout_lines(data, max_pages)
     else:
-        raise ValueError("Unsupported file type")
+        lines = _docx_layout_lines(data)
+    return LayoutDocument(lines, max_chars)
+
+def text_layout(text, max_chars=MAX_DOCUMENT_CHARS):
+    """LayoutDocument for pasted text: headers are short keyword lines in caps or ending with ':'"""
+    return LayoutDocument(_text_layout_lines(text), max_chars)
+
+_LINE = re.compile(r'[^\n]+')
+# Dotted abbreviations ("c.p.a.") are one token; their text drops the dots
+_TOKEN = re.compile(r"[^\W\d_](?:\.[^\W\d_])+(?![^\W\d_])\.?|\w[\w'+\-]*")
+# Sentence ends for the regex fallback (cleaned text has no punctuation, so it stays one sentence)
+_SENTENCE = re.compile(r'[^.!?\n]+[.!?]*')
+
+class TextSpan:
+    """A slice of a TextDocument; start/end are offsets into the original text"""
+
+    __slots__ = ('text', 'start', 'end')
+
+    def __init__(self, text, start, end):
+        self.text = text
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"TextSpan({self.text!r}, {self.start}, {self.end})"
+
+class TextDocument:
+    """
+    One text with views derived on first access: lowercased text and the line,
+    sentence and token tables (TextSpans with offsets into the original text).
+    Analyzers take a TextDocument (or a plain string, see as_text_document) so a
+    request lowercases and splits each text once, and offsets agree everywhere.
+    nlp (optional, e.g. an AnalysisContext) supplies sentence boundaries;
+    without it sentences are split on . ! ? and line breaks.
+    """
+
+    def __init__(self, text, nlp=None):
+        self.text = text
+        self._nlp = nlp
+        self._lower = None
+        self._lines = None
+        self._sentences = None
+        self._tokens = None
+        self._derived = {}
+
+    def __len__(self):
+        return len(self.text)
+
+    @property
+    def lower(self):
+        """Lowercased text, the same length as text so offsets carry over"""
+        if self._lower is None:
+            lower = self.text.lower()
+            if len(lower) != len(self.text):
+                # A few characters (e.g. 'İ') lowercase to two; leave those as they are
+                lower = ''.join(c if len(c.lower()) != 1 else c.lower() for c in self.text)
+            self._lower = lower
+        return self._lower
+
+    @property
+    def lines(self):
+        """Non-empty lines, stripped"""
+        if self._lines is None:
+            self._lines = []
+            for match in _LINE.finditer(self.text):
+                line = match.group()
+                stripped = line.strip()
+                if stripped:
+                    start = match.start() + (len(line) - len(line.lstrip()))
+                    self._lines.append(TextSpan(stripped, start, start + len(stripped)))
+        return self._lines
+
+    @property
+    def sentences(self):
+        if self._sentences is None:
+            if self._nlp is not None:
+                spans = ((sent.text, sent.start_char, sent.end_char) for sent in get_sentences(self.text, self._nlp))
+            else:
+                spans = ((m.group(), m.start(), m.end()) for m in _SENTENCE.finditer(self.text))
+            self._sentences = []
+            for text, start, end in spans:
+                stripped = text.strip()
+                if stripped:
+                    start += len(text) - len(text.lstrip())
+                    self._sentences.append(TextSpan(stripped, start, start + len(stripped)))
+        return self._sentences
+
+    @property
+    def tokens(self):
+        """Word tokens of the lowercased text ("c.p.a." -> 'cpa')"""
+        if self._tokens is None:
+            self._tokens = [TextSpan(m.group().replace('.', ''), m.start(), m.end()) for m in _TOKEN.finditer(self.lower)]
+        return self._tokens
 
-def extract_sections(text):
+    def count(self, phrase):
+        """Case-insensitive occurrences of phrase (substring semantics, like str.count)"""
+        return self.lower.count(phrase.lower())
+
+    def find(self, phrase, start=0):
+        """Offset of the first case-insensitive occurrence of phrase at or after start, or -1"""
+        return self.lower.find(phrase.lower(), start)
+
+    def __contains__(self, phrase):
+        return phrase.lower() in self.lower
+
+    def derived(self, name, compute):
+        """compute(self), computed once per document and kept under name (e.g. dictionary hits)"""
+        if name not in self._derived:
+            self._derived[name] = compute(self)
+        return self._derived[name]
+
+def tokenize(text):
+    """Lowercased word tokens, split the same way as TextDocument.tokens"""
+    return [token.replace('.', '') for token in _TOKEN.findall(text.lower())]
+
+def as_text_document(text, nlp=None):
+    """TextDocument for text, reusing it when text already is one"""
+    if isinstance(text, TextDocument):
+        return text
+    return TextDocument(text, nlp)
+
+def extract_sections(text, nlp=None, layout=None):
     """
     Extract resume sections with improved header detection.
     Handles various section header formats and resume structures.
+    With a LayoutDocument whose headers were recognised, its structural sections are
+    returned and no NLP runs; otherwise sentences are matched against header keywords.
+    nlp may be an AnalysisContext so the parse is shared with other analyzers.
     """
-    doc = nlp(text)
+    if layout is not None and layout.has_headers:
+        return layout.sections
+
+    if nlp is None:
+        nlp = get_nlp()
+    sentences = get_sentences(text, nlp)
     sections = {"experience": [], "skills": [], "education": [], "other": []}
     current_section = "other"  # Default to "other" instead of None
 
-    # More comprehensive section header patterns
-    experience_keywords = ['experience', 'work history', 'employment', 'professional background',
-                          'work experience', 'career history', 'employment history']
-    skills_keywords = ['skills', 'technical skills', 'core competencies', 'qualifications',
-                      'expertise', 'proficiencies', 'capabilities']
-    education_keywords = ['education', 'academic background', 'academic credentials',
-                         'degrees', 'certifications', 'training']
-
-    for sent in doc.sents:
+    for sent in sentences:
         sent_text = sent.text.strip().lower()
 
         # Check if this is a section header
-        is_header = False
-
-        # Experience section
-        if any(keyword in sent_text for keyword in experience_keywords):
-            current_section = "experience"
-            is_header = True
-        # Skills section
-        elif any(keyword in sent_text for keyword in skills_keywords):
-            current_section = "skills"
-            is_header = True
-        # Education section
-        elif any(keyword in sent_text for keyword in education_keywords):
-            current_section = "education"
-            is_header = True
+        section = classify_header(sent_text)
+        if section is not None:
+            current_section = section
 
         # Add content to current section (skip section headers)
-        if not is_header and sent.text.strip():
+        if section is None and sent.text.strip():
             sections[current_section].append(sent.text.strip())
 
     # Fallback: If no experience section found, treat entire document as experience
     # This helps with resumes that don't have explicit section headers
     if not sections["experience"]:
-        sections["experience"] = [sent.text.strip() for sent in doc.sents if sent.text.strip()]
+        sections["experience"] = [sent.text.strip() for sent in sentences if sent.text.strip()]
 
     return sections
@@ -0,0 +1,318 @@
+"""
+Career timeline
+
+Role entries (title, level, start and end dates, duration) are read from a
+resume once and shared by seniority extraction, experience progression and the
+consistency checks, so they agree on what the roles and the years are.
+
+Date ranges come from the shared numeric scan (utils/numeric_signals). Each
+range is one role, titled by the title words on its line or, failing that,
+the nearest short line above it. Title words that open a bullet as a verb
+("Lead delivery of ...") never name a role.
+
+Usage:
+    timeline = extract_timeline(resume_sections['experience'], levels)
+    timeline.years, timeline.roles, timeline.average_level
+"""
+import re
+from datetime import datetime
+from utils.numeric_signals import numeric_facts
+from utils.parser import as_text_document
+
+# Seniority indicators for IC track, management, creative roles, and more
+TITLE_PATTERN = re.compile(
+    r'\b('
+    # Junior level
+    r'junior|entry|entry-level|associate|intern|trainee|assistant|'
+    # Mid level
+    r'mid-level|intermediate|specialist|analyst|consultant|engineer|developer|designer|coordinator|'
+    r'supervisor|controller|'
+    # Senior IC track
+    r'senior|sr\.|lead|principal|staff|distinguished|fellow|expert|architect|'
+    # Management track
+    r'manager|head of|director|vp|vice president|c-level|ceo|cto|cfo|coo|cmo|president|'
+    # Creative/Non-traditional
+    r'freelance|contractor|founder|co-founder|owner|partner'
+    r')\b',
+    re.IGNORECASE
+)
+
+# Level scores (1 junior - 4 exec) with more granular levels
+SCORE_MAP = {
+    "junior": 1,
+    "mid": 2,
+    "senior": 3,
+    "exec": 4,
+    # Additional mappings for granularity
+    "entry": 1,
+    "intermediate": 2,
+    "staff": 3.5,  # Between senior and exec
+    "principal": 3.5,
+    "distinguished": 3.8,
+    "fellow": 4,
+    "lead": 3,
+    "manager": 3,
+    "head": 3.5,
+    "founder": 4,
+    "partner": 4
+}
+
+MAX_TITLE_LINE_WORDS = 8  # Longer lines are bullets, not title lines
+MAX_TITLE_GAP_WORDS = 4  # Title words further from the dates on their line belong to something else
+_WORD = re.compile(r'\S+')
+_YEAR = re.compile(r'\b(19\d{2}|20\d{2})\b')
+
+# Title words that are also verbs; at the start of a bullet they begin a sentence, not a title
+VERB_TITLES = {'lead', 'partner', 'staff', 'engineer', 'architect'}
+_BULLET_MARKS = ' \t•*·▪-–—'
+
+
+def title_level(title_word, levels=None):
+    """Level score of a title word; configured levels (seniority_levels.json) are checked first"""
+    for lvl, keywords in (levels or {}).items():
+        if any(k in title_word for k in keywords):
+            return SCORE_MAP.get(lvl, 2)  # Default to mid-level if unknown
+    if title_word in SCORE_MAP:
+        return SCORE_MAP[title_word]
+    # Default scoring based on common patterns
+    if any(x in title_word for x in ['junior', 'entry', 'intern', 'assistant', 'associate']):
+        return 1
+    if any(x in title_word for x in ['senior', 'sr', 'lead', 'principal', 'staff', 'architect']):
+        return 3
+    if any(x in title_word for x in ['director', 'vp', 'chief', 'head', 'president', 'founder']):
+        return 4
+    return 2  # Default to mid-level
+
+
+def level_name(score):
+    """'junior', 'mid', 'senior' or 'exec' for a level score"""
+    if score < 1.5:
+        return 'junior'
+    if score < 2.5:
+        return 'mid'
+    if score < 3.75:
+        return 'senior'
+    return 'exec'
+
+
+class TitleMention:
+    """A title word (e.g. 'senior', 'manager') with its level score and offsets"""
+
+    __slots__ = ('word', 'level', 'start', 'end')
+
+    def __init__(self, word, level, start, end):
+        self.word = word
+        self.level = level
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"TitleMention({self.word!r}, {self.level}, {self.start}, {self.end})"
+
+
+class RoleEntry:
+    """
+    One role: a date range and the title found for it (None if no title was found)
+    Dates are (year, month) with month None when not given; end is None while ongoing.
+    start/end are offsets of the date range in the text.
+    """
+
+    __slots__ = ('title', 'level', 'start_date', 'end_date', 'start', 'end', '_now')
+
+    def __init__(self, title, level, start_date, end_date, start, end, now):
+        self.title = title
+        self.level = level
+        self.start_date = start_date
+        self.end_date = end_date
+        self.start = start
+        self.end = end
+        self._now = now
+
+    @property
+    def ongoing(self):
+        return self.end_date is None
+
+    @property
+    def start_year(self):
+        return self.start_date[0]
+
+    @property
+    def end_year(self):
+        return self._now.year if self.ongoing else self.end_date[0]
+
+    @property
+    def interval(self):
+        """(start, end) in fractional years; a missing month counts as January"""
+        start_year, start_month = self.start_date
+        if self.ongoing:
+            end_year, end_month = self._now.year, self._now.month
+        else:
+            end_year, end_month = self.end_date
+        return start_year + ((start_month or 1) - 1) / 12, end_year + ((end_month or 1) - 1) / 12
+
+    @property
+    def duration(self):
+        """Years in the role (0 for reversed ranges)"""
+        start, end = self.interval
+        return max(0.0, end - start)
+
+    @property
+    def level_name(self):
+        return level_name(self.level) if self.level is not None else None
+
+    def __repr__(self):
+        return f"RoleEntry({self.title!r}, {self.level}, {self.start_date}, {self.end_date})"
+
+
+class CareerTimeline:
+    """
+    Roles, title mentions and stated years ("10+ years of experience") of one text
+
+    entries: every date range as a RoleEntry, in text order
+    titles: every TitleMention, in text order
+    stated_years: years stated in words, in text order
+    years_mentioned: every 4-digit year in the text, in text order, in a range or not
+    """
+
+    def __init__(self, entries, titles, stated_years, years_mentioned=()):
+        self.entries = entries
+        self.titles = titles
+        self.stated_years = stated_years
+        self.years_mentioned = list(years_mentioned)
+
+    @property
+    def roles(self):
+        """Entries with a title, ordered by start date"""
+        return sorted((entry for entry in self.entries if entry.title), key=lambda entry: entry.interval[0])
+
+    @property
+    def years(self):
+        """Years covered by the date ranges; overlapping roles are counted once"""
+        total = 0.0
+        covered_until = None
+        for start, end in sorted(entry.interval for entry in self.entries if entry.duration > 0):
+            if covered_until is not None and start < covered_until:
+                start = covered_until
+            if end > start:
+                total += end - start
+                covered_until = end
+        return total
+
+    @property
+    def average_level(self):
+        """Mean level score of every title mention (0 when there are none)"""
+        return sum(title.level for title in self.titles) / max(1, len(self.titles))
+
+
+def _line_bounds(text, start, end, low, high):
+    """Bounds of the line around start:end, clipped to low:high"""
+    line_end = text.find('\n', end)
+    if line_end == -1:
+        line_end = len(text)
+    return max(low, text.rfind('\n', 0, start) + 1), min(high, line_end)
+
+
+def _words_between(text, start, end):
+    return len(text[start:end].split())
+
+
+def _used_as_verb(text, titles, i, range_ends):
+    """True if titles[i] opens a bullet as a verb ("Lead delivery of ...") rather than naming a role"""
+    title = titles[i]
+    if title.word not in VERB_TITLES:
+        return False
+    if i + 1 < len(titles) and not text[title.end:titles[i + 1].start].strip():
+        return False  # Part of a title run ("lead analyst")
+    line_start, line_end = _line_bounds(text, title.start, title.end, 0, len(text))
+    if not text[title.end:line_end].strip(' ,|'):
+        return False  # The whole line ("Lead")
+    before = text[line_start:title.start].rstrip(_BULLET_MARKS)
+    # First word of its line, or right after a role's dates (cleaned text keeps no line breaks)
+    return not before or line_start + len(before) in range_ends
+
+
+def _role_title(text, titles, date_range, low, high):
+    """(title text, level) for the date range at date_range, looking only within low:high"""
+    line_start, line_end = _line_bounds(text, date_range.start, date_range.end, low, high)
+
+    # Title words next to the dates on their line, nearest first; before the dates wins ties
+    # ("Senior Analyst, Acme, 2015 - 2018" or "may 2017  september 2020 senior compensation analyst")
+    nearby = []
+    for title in titles:
+        if line_start <= title.start and title.end <= date_range.start:
+            nearby.append((_words_between(text, title.end, date_range.start), 0, title))
+        elif date_range.end <= title.start and title.end <= line_end:
+            nearby.append((_words_between(text, date_range.end, title.start), 1, title))
+    nearby = [item for item in nearby if item[0] <= MAX_TITLE_GAP_WORDS]
+    if nearby:
+        _, after, anchor = min(nearby, key=lambda item: item[:2])
+    else:
+        # Nearest short line above the dates with a title word
+        after, anchor = 0, None
+        for title in reversed([title for title in titles if low <= title.start and title.end <= date_range.start]):
+            start, end = _line_bounds(text, title.start, title.end, low, date_range.start)
+            if len(text[start:end].split()) <= MAX_TITLE_LINE_WORDS:
+                anchor = title
+                line_start, line_end = start, end
+                break
+        if anchor is None:
+            return None, None
+
+    if len(text[line_start:line_end].split()) <= MAX_TITLE_LINE_WORDS:
+        span_start, span_end = line_start, line_end
+    elif after:
+        # A long line (e.g. cleaned text): from the dates to the last title word of the run
+        span_start, span_end = date_range.end, anchor.end
+        for title in titles:
+            if title.start >= span_end and _words_between(text, span_end, title.start) <= 2 and title.end <= line_end:
+                span_end = title.end
+    else:
+        # A long line: the title word and the two words before it
+        preceding = list(_WORD.finditer(text, line_start, anchor.start))[-2:]
+        span_start = preceding[0].start() if preceding else anchor.start
+        span_end = anchor.end
+
+    level = max(title.level for title in titles if span_start <= title.start and title.end <= span_end)
+    if span_start <= date_range.start and date_range.end <= span_end:
+        title_text = text[span_start:date_range.start] + text[date_range.end:span_end]
+    else:
+        title_text = text[span_start:span_end]
+    return ' '.join(title_text.split()).strip(' ,|-–—'), level
+
+
+def extract_timeline(text, levels=None, now=None):
+    """
+    CareerTimeline of text: a string, TextDocument or list of section items (joined by lines)
+    levels: seniority_levels.json mapping used to score title words
+    now: datetime that ongoing ("present") roles end at (default: now)
+    """
+    if isinstance(text, (list, tuple)):
+        text = '\n'.join(text)
+    document = as_text_document(text)
+    text = document.text
+    now = now or datetime.now()
+
+    titles = [
+        TitleMention(match.group(1).lower(), title_level(match.group(1).lower(), levels), match.start(), match.end())
+        for match in TITLE_PATTERN.finditer(text)
+    ]
+    date_ranges = numeric_facts(document, 'year_range')
+    stated_years = [fact.value for fact in numeric_facts(document, 'years_required')]
+    years_mentioned = [int(year) for year in _YEAR.findall(text)]
+
+    # Title words that can name a role (verbs opening a bullet cannot)
+    range_ends = {date_range.end for date_range in date_ranges}
+    anchors = [title for i, title in enumerate(titles) if not _used_as_verb(text, titles, i, range_ends)]
+
+    entries = []
+    for i, date_range in enumerate(date_ranges):
+        # A role's title never reaches past the neighbouring roles' dates
+        low = date_ranges[i - 1].end if i > 0 else 0
+        high = date_ranges[i + 1].start if i + 1 < len(date_ranges) else len(text)
+        title, level = _role_title(text, anchors, date_range, low, high)
+        start_year, start_month, end_year, end_month = date_range.value
+        end_date = None if end_year is None else (end_year, end_month)
+        entries.append(RoleEntry(title, level, (start_year, start_month), end_date,
+                                 date_range.start, date_range.end, now))
+
+    return CareerTimeline(entries, titles, stated_years, years_mentioned)
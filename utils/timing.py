@@ -0,0 +1,51 @@
+"""
+Per-stage timing for the analysis pipeline
+
+match_resume_jd wraps each stage in `with stage('name'):`. Outside of a
+record_stages() block this is a no-op, so production calls pay nothing; the
+benchmark harness (benchmarks/run_benchmarks.py) turns recording on to collect
+per-stage latencies.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+_active = threading.local()
+
+
+class StageRecorder:
+    """Collected durations (seconds) per stage name, in first-seen order"""
+
+    def __init__(self):
+        self.timings = {}
+
+    def add(self, name, seconds):
+        self.timings.setdefault(name, []).append(seconds)
+
+    def totals(self):
+        return {name: sum(values) for name, values in self.timings.items()}
+
+
+@contextmanager
+def record_stages(recorder=None):
+    """Record every stage() entered on this thread into recorder"""
+    recorder = recorder or StageRecorder()
+    previous = getattr(_active, 'recorder', None)
+    _active.recorder = recorder
+    try:
+        yield recorder
+    finally:
+        _active.recorder = previous
+
+
+@contextmanager
+def stage(name):
+    recorder = getattr(_active, 'recorder', None)
+    if recorder is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add(name, time.perf_counter() - start)
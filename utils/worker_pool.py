@@ -0,0 +1,114 @@
+"""
+Pre-fork worker pool
+
+en_core_web_lg and stsb-roberta-large take ~2 GB per process. Instead of every
+worker loading its own copy, the parent loads the models once and then forks
+the workers, which share the weights copy-on-write. gc.freeze() moves the
+preloaded objects out of the collector's generations, so garbage collection in
+a worker does not touch (and copy) the pages holding them.
+
+Usage:
+    pool = PreforkPool(processes=4, ontology_path=...)
+    pool.start()
+    future = pool.submit(match_resume_jd, resume, jd, ontology_path, seniority_path)
+
+Jobs must be module-level functions (they are pickled by reference). Fork is
+POSIX-only; on other platforms use a thread pool instead.
+"""
+import gc
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+TORCH_THREADS = int(os.environ.get('ROLEIQ_WORKER_TORCH_THREADS', '1'))
+
+
+def preload_models(ontology_path=None):
+    """Load spaCy, the sentence transformer and (optionally) the ontology index in this process"""
+    from utils.model_cache import get_nlp, get_embedding_model
+    get_nlp()
+    model = get_embedding_model()
+    # Import the pipeline modules too, so workers don't each import them after the fork
+    import utils.matcher  # noqa: F401
+    if ontology_path:
+        from utils.ontology_index import get_ontology_index
+        get_ontology_index(ontology_path, model)
+    gc.collect()
+    gc.freeze()
+
+
+def _init_worker():
+    # N workers each running N intra-op threads would oversubscribe the cores
+    try:
+        import torch
+        torch.set_num_threads(TORCH_THREADS)
+    except ImportError:
+        pass
+
+    # SQLite connections must not be shared across a fork; reopen the disk tier
+    from utils.embedding_cache import SQLiteEmbeddingStore
+    from utils.model_cache import get_embedding_model
+    model = get_embedding_model()
+    if getattr(model, 'disk', None) is not None:
+        model.disk = SQLiteEmbeddingStore(model.disk.path)
+    from utils.document_cache import SQLiteDocumentStore, get_document_cache
+    document_cache = get_document_cache()
+    if document_cache.disk is not None:
+        document_cache.disk = SQLiteDocumentStore(document_cache.disk.path)
+
+
+def _ready():
+    return os.getpid()
+
+
+class PreforkPool:
+    """Process pool whose workers are forked after the models are loaded"""
+
+    def __init__(self, processes=None, ontology_path=None):
+        self.processes = processes or os.cpu_count() or 1
+        self.ontology_path = ontology_path
+        self._executor = None
+
+    def start(self):
+        """
+        Load models, then fork all workers up front
+
+        Call this before the parent starts other threads (e.g. a thread pool or
+        event loop executor); forking a multi-threaded process is unsafe.
+        """
+        if self._executor is not None:
+            return self
+        preload_models(self.ontology_path)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_worker
+        )
+        # The fork context launches every worker on the first submit
+        self._executor.submit(_ready).result()
+        return self
+
+    @property
+    def executor(self):
+        """The underlying Executor, for loop.run_in_executor"""
+        if self._executor is None:
+            raise RuntimeError('PreforkPool.start() has not been called')
+        return self._executor
+
+    def submit(self, func, *args, **kwargs):
+        return self.executor.submit(func, *args, **kwargs)
+
+    def map(self, func, *iterables, chunksize=1):
+        """Dispatch jobs across the workers, yielding results in input order"""
+        return self.executor.map(func, *iterables, chunksize=chunksize)
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown()